@@ -0,0 +1,350 @@
+#!/usr/bin/env python3
+"""
+Offline benchmark for the reaction -> translation -> DM pipeline
+Drives main.on_raw_reaction_add with synthetic payloads, fake Discord objects and a stub
+translator, and reports throughput, latency percentiles and memory per scenario.
+
+    python benchmark.py                          # all scenarios
+    python benchmark.py --scenario viral --reactions 5000
+    python benchmark.py --save baseline.json     # later: --baseline baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import math
+import os
+import sys
+import time
+import tracemalloc
+from types import SimpleNamespace
+
+from memory_stats import read_rss_bytes
+
+# Benchmark defaults, set before main.py reads its configuration (explicit env vars win)
+BENCHMARK_ENV = {
+    'TRANSLATION_BACKEND': 'stub',
+    'TRANSLATION_CACHE_DB': '',            # memory tier only, nothing written to disk
+    'TRANSLATION_RATE_LIMIT': '0',         # measure the pipeline, not the configured upstream budget
+    'TRANSLATION_MAX_QUEUE': '100000',
+    'USER_QUOTA_RATE': '1000',
+    'USER_QUOTA_BURST': '1000',
+    'GUILD_QUOTA_RATE': '100000',
+    'GUILD_QUOTA_BURST': '100000',
+    'GUILD_MAX_QUEUE': '100000',
+    'BREAKER_RESET_TIMEOUT': '1',
+}
+
+SHORT_TEXT = "The new release is out, please check the changelog before updating your server."
+LONG_PARAGRAPH = (
+    "Patch notes for this week: we reworked the matchmaking queue, fixed a crash when joining voice "
+    "channels on mobile and improved the loading times of large servers. Please report any issues "
+    "in the support channel and include your client version. "
+)
+
+SCENARIOS = {
+    # one message, thousands of users reacting with a few flags
+    'viral': {'messages': 1, 'languages': 3, 'text': 'short', 'reactions': 2000, 'rate': 0},
+    # many messages, every supported language
+    'many_languages': {'messages': 50, 'languages': None, 'text': 'short', 'reactions': 2000, 'rate': 0},
+    # texts long enough to be split into embeds
+    'long_texts': {'messages': 200, 'languages': 2, 'text': 'long', 'reactions': 400, 'rate': 0},
+    # the upstream fails for the middle 40 % of the arrival window
+    'outage': {'messages': 100, 'languages': 5, 'text': 'short', 'reactions': 1500, 'rate': 500, 'outage': (0.3, 0.7)},
+}
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of an already sorted list"""
+    if not values:
+        return 0.0
+    return values[min(len(values), max(1, math.ceil(fraction * len(values)))) - 1]
+
+
+class SyntheticBackend:
+    """Stub translator with latency, call counters and an optional outage window"""
+    name = 'stub'
+    max_batch_size = 100
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.outage = None  # (start, end) in time.perf_counter() seconds
+        self.calls = 0
+        self.texts = 0
+        self.failures = 0
+
+    def translate_batch(self, texts, dest):
+        self.calls += 1
+        if self.latency:
+            time.sleep(self.latency)
+        if self.outage is not None and self.outage[0] <= time.perf_counter() < self.outage[1]:
+            self.failures += 1
+            raise ConnectionError("Simulierter Upstream-Ausfall")
+        self.texts += len(texts)
+        return [f"[{dest}] {text}" for text in texts]
+
+
+class Recorder:
+    """Collects completion times of reaction removals (the last step of a successful reaction)"""
+    def __init__(self):
+        self.started = {}   # (message_id, emoji, user_id) -> perf_counter at reaction
+        self.latencies = []
+        self.dm_messages = 0
+        self.last_done = None
+
+    def done(self, message_id, emoji, user_id):
+        start = self.started.pop((message_id, str(emoji), user_id), None)
+        if start is not None:
+            self.last_done = time.perf_counter()
+            self.latencies.append(self.last_done - start)
+
+
+class FakeMember:
+    bot = False
+
+    def __init__(self, user_id, recorder, latency):
+        self.id = user_id
+        self.recorder = recorder
+        self.latency = latency
+
+    async def send(self, content=None, embeds=None, **kwargs):
+        await asyncio.sleep(self.latency)
+        self.recorder.dm_messages += 1
+
+    def __str__(self):
+        return f"benchmark-user-{self.id}"
+
+
+class FakeMessage:
+    def __init__(self, message_id, content, channel, recorder, latency):
+        self.id = message_id
+        self.content = content
+        self.channel = channel
+        self.recorder = recorder
+        self.latency = latency
+
+    async def remove_reaction(self, emoji, member):
+        await asyncio.sleep(self.latency)
+        self.recorder.done(self.id, emoji, member.id)
+
+
+class FakeChannel:
+    def __init__(self, channel_id, latency):
+        self.id = channel_id
+        self.latency = latency
+        self.messages = {}
+        self.fetches = 0
+
+    async def fetch_message(self, message_id):
+        self.fetches += 1
+        await asyncio.sleep(self.latency)
+        return self.messages[message_id]
+
+    def get_partial_message(self, message_id):
+        return self.messages[message_id]
+
+
+def _histogram_avg(before, after):
+    count = after['count'] - before['count']
+    return round((after['sum'] - before['sum']) / count * 1000, 2) if count else 0
+
+
+async def run_scenario(bot, name, spec, args, backend, id_offset):
+    """Replay one scenario and return its measurements"""
+    reactions = args.reactions or spec['reactions']
+    rate = spec['rate'] if args.rate is None else args.rate
+    flags = list(dict.fromkeys(bot.FLAG_LANG_MAP.values()))  # one flag per language
+    flag_for = {lang: flag for flag, lang in reversed(list(bot.FLAG_LANG_MAP.items()))}
+    languages = [flag_for[lang] for lang in flags[:spec['languages'] or len(flags)]]
+
+    recorder = Recorder()
+    channels = {}
+    messages = []
+    for index in range(spec['messages']):
+        guild_id = 1000 + index % args.guilds
+        channel = channels.setdefault(guild_id, FakeChannel(guild_id, args.fetch_latency))
+        if spec['text'] == 'long':
+            content = f"#{index} " + LONG_PARAGRAPH * (args.long_length // len(LONG_PARAGRAPH) + 1)
+        else:
+            content = f"#{index} {SHORT_TEXT}"
+        message = FakeMessage(id_offset + index, content, channel, recorder, args.reaction_latency)
+        channel.messages[message.id] = message
+        messages.append((guild_id, message))
+    bot.bot.get_channel = channels.get
+
+    payloads = []
+    for index in range(reactions):
+        guild_id, message = messages[index % len(messages)]
+        emoji = languages[(index // len(messages)) % len(languages)]
+        member = FakeMember(id_offset + index + 1, recorder, args.dm_latency)
+        payloads.append(SimpleNamespace(
+            member=member, user_id=member.id, emoji=emoji, guild_id=guild_id,
+            channel_id=guild_id, message_id=message.id
+        ))
+
+    window = reactions / rate if rate else 0.0
+    start = time.perf_counter()
+    if spec.get('outage'):
+        begin, end = spec['outage']
+        backend.outage = (start + begin * max(window, 1.0), start + end * max(window, 1.0))
+    else:
+        backend.outage = None
+
+    calls_before, texts_before, failures_before = backend.calls, backend.texts, backend.failures
+    errors_before = bot.errors_total.total()
+    stages_before = {stage: bot.stage_latency.to_dict(stage=stage) for stage in bot.REACTION_STAGES}
+    coalesced_before = bot.translation_flights.get_stats()['merged']
+    handler_latencies = []
+
+    async def react(payload, delay):
+        if delay:
+            await asyncio.sleep(delay)
+        began = time.perf_counter()
+        recorder.started[(payload.message_id, payload.emoji, payload.user_id)] = began
+        await bot.on_raw_reaction_add(payload)
+        handler_latencies.append(time.perf_counter() - began)
+
+    if args.tracemalloc:
+        tracemalloc.reset_peak()
+    traced_before = tracemalloc.get_traced_memory()[0] if args.tracemalloc else 0
+
+    await asyncio.gather(*(react(payload, index / rate if rate else 0) for index, payload in enumerate(payloads)))
+    handlers_done = time.perf_counter()
+
+    # Wait for the outbox: every reaction that did not fail ends with its reaction being removed
+    failed = bot.errors_total.total() - errors_before
+    deadline = time.perf_counter() + args.drain_timeout
+    while len(recorder.latencies) < reactions - failed and time.perf_counter() < deadline:
+        await asyncio.sleep(0.01)
+    end = recorder.last_done or handlers_done
+
+    traced_now, traced_peak = tracemalloc.get_traced_memory() if args.tracemalloc else (0, 0)
+    stages_after = {stage: bot.stage_latency.to_dict(stage=stage) for stage in bot.REACTION_STAGES}
+    latencies = sorted(recorder.latencies)
+    handler_latencies.sort()
+    elapsed = max(end - start, 1e-9)
+    return {
+        'scenario': name,
+        'reactions': reactions,
+        'completed': len(latencies),
+        'failed': failed,
+        'lost': reactions - failed - len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput': round(len(latencies) / elapsed, 1),
+        'latency_ms': {
+            'p50': round(percentile(latencies, 0.50) * 1000, 2),
+            'p95': round(percentile(latencies, 0.95) * 1000, 2),
+            'p99': round(percentile(latencies, 0.99) * 1000, 2),
+            'max': round(latencies[-1] * 1000, 2) if latencies else 0
+        },
+        'handler_ms': {
+            'p50': round(percentile(handler_latencies, 0.50) * 1000, 2),
+            'p99': round(percentile(handler_latencies, 0.99) * 1000, 2)
+        },
+        'stages_avg_ms': {stage: _histogram_avg(stages_before[stage], stages_after[stage]) for stage in bot.REACTION_STAGES},
+        'upstream_calls': backend.calls - calls_before,
+        'upstream_texts': backend.texts - texts_before,
+        'upstream_failures': backend.failures - failures_before,
+        'coalesced': bot.translation_flights.get_stats()['merged'] - coalesced_before,
+        'message_fetches': sum(channel.fetches for channel in channels.values()),
+        'dm_messages': recorder.dm_messages,
+        'memory': {
+            'traced_growth_bytes': traced_now - traced_before,
+            'traced_peak_bytes': traced_peak,
+            'rss_bytes': (read_rss_bytes() or 0) if args.rss else 0
+        }
+    }
+
+
+def print_result(result):
+    latency = result['latency_ms']
+    memory = result['memory']
+    print(f"\n📊 {result['scenario']}")
+    print(f"   Reaktionen: {result['reactions']} · fertig: {result['completed']} · fehlgeschlagen: {result['failed']} · verloren: {result['lost']}")
+    print(f"   Durchsatz: {result['throughput']} /s in {result['seconds']} s")
+    print(f"   Latenz: p50 {latency['p50']} ms · p95 {latency['p95']} ms · p99 {latency['p99']} ms · max {latency['max']} ms")
+    print(f"   Handler: p50 {result['handler_ms']['p50']} ms · p99 {result['handler_ms']['p99']} ms")
+    print("   Schritte (Ø ms): " + ", ".join(f"{stage} {value}" for stage, value in result['stages_avg_ms'].items()))
+    print(f"   Upstream: {result['upstream_calls']} Aufrufe, {result['upstream_texts']} Texte, {result['upstream_failures']} Fehler · "
+          f"zusammengeführt: {result['coalesced']} · fetch_message: {result['message_fetches']} · DMs: {result['dm_messages']}")
+    print(f"   Speicher: tracemalloc Spitze {memory['traced_peak_bytes'] / 1048576:.1f} MB, "
+          f"Zuwachs {memory['traced_growth_bytes'] / 1048576:.1f} MB, RSS {memory['rss_bytes'] / 1048576:.1f} MB")
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of regressions against a saved baseline"""
+    regressions = []
+    for result in results:
+        base = baseline.get(result['scenario'])
+        if base is None:
+            continue
+        if result['throughput'] < base['throughput'] * (1 - tolerance):
+            regressions.append(f"{result['scenario']}: Durchsatz {result['throughput']} /s (Basis {base['throughput']} /s)")
+        if result['latency_ms']['p99'] > base['latency_ms']['p99'] * (1 + tolerance):
+            regressions.append(f"{result['scenario']}: p99 {result['latency_ms']['p99']} ms (Basis {base['latency_ms']['p99']} ms)")
+    return regressions
+
+
+async def run(args):
+    for key, value in BENCHMARK_ENV.items():
+        os.environ.setdefault(key, value)
+    os.environ.pop('DISCORD_TOKEN', None)
+    with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+        import main as bot  # reads the configuration above, never connects
+    backend = SyntheticBackend(args.translate_latency)
+    bot.translation_service.backend = backend
+
+    results = []
+    for index, name in enumerate(args.scenario or SCENARIOS):
+        with open(os.devnull, 'w') as devnull, contextlib.redirect_stdout(devnull):
+            # fresh message and user ids per scenario so caches from earlier runs do not help
+            result = await run_scenario(bot, name, SCENARIOS[name], args, backend, (index + 1) * 10_000_000)
+        results.append(result)
+        if not args.json:
+            print_result(result)
+    bot.translation_service.close()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline-Benchmark der Reaktions-Pipeline")
+    parser.add_argument('--scenario', action='append', choices=sorted(SCENARIOS), help="nur dieses Szenario (mehrfach möglich)")
+    parser.add_argument('--reactions', type=int, help="Anzahl Reaktionen (Standard je Szenario)")
+    parser.add_argument('--rate', type=float, help="Reaktionen pro Sekunde, 0 = alle auf einmal (Standard je Szenario)")
+    parser.add_argument('--guilds', type=int, default=10)
+    parser.add_argument('--translate-latency', type=float, default=0.05, help="Sekunden pro Upstream-Aufruf")
+    parser.add_argument('--fetch-latency', type=float, default=0.08, help="Sekunden für fetch_message")
+    parser.add_argument('--dm-latency', type=float, default=0.1, help="Sekunden pro DM")
+    parser.add_argument('--reaction-latency', type=float, default=0.08, help="Sekunden für remove_reaction")
+    parser.add_argument('--long-length', type=int, default=3500, help="Zeichen der langen Texte")
+    parser.add_argument('--drain-timeout', type=float, default=120)
+    parser.add_argument('--no-tracemalloc', dest='tracemalloc', action='store_false')
+    parser.add_argument('--no-rss', dest='rss', action='store_false')
+    parser.add_argument('--json', action='store_true', help="Ergebnisse als JSON ausgeben")
+    parser.add_argument('--save', help="Ergebnisse als Basis für spätere Vergleiche speichern")
+    parser.add_argument('--baseline', help="mit gespeicherter Basis vergleichen, Exit-Code 1 bei Regression")
+    parser.add_argument('--tolerance', type=float, default=0.2, help="erlaubte Abweichung zur Basis (0.2 = 20 %%)")
+    args = parser.parse_args()
+
+    if args.tracemalloc:
+        tracemalloc.start()
+    results = asyncio.run(run(args))
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+    if args.save:
+        with open(args.save, 'w', encoding='utf-8') as f:
+            json.dump({result['scenario']: result for result in results}, f, indent=2)
+    if args.baseline:
+        with open(args.baseline, 'r', encoding='utf-8') as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+        for regression in regressions:
+            print(f"❌ Regression: {regression}")
+        if regressions:
+            sys.exit(1)
+        print("✅ Keine Regression gegenüber der Basis")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Per-guild configuration for Discord Translation Bot
+Loaded from a JSON file next to the .env and reloaded when the file changes:
+
+    {
+        "guilds": {
+            "123456789012345678": {
+                "flags": {"🇦🇹": "de", "🇨🇭": "de", "🇧🇪": null},
+                "auto_translate": {"234567890123456789": ["en", "de", "fr"]}
+            }
+        }
+    }
+
+"flags" adds to or overrides FLAG_LANG_MAP for that guild (null removes a flag),
+"auto_translate" maps channel ids to the languages their new messages are pre-translated into.
+"""
+
+import json
+import os
+import time
+
+
+class GuildConfig:
+    """Flag overrides and auto-translate channels per guild"""
+    def __init__(self, path, default_flags, reload_interval=30):
+        self.path = path
+        self.default_flags = default_flags
+        self.reload_interval = reload_interval
+        self._guilds = {}      # guild_id -> {'flags': {...}, 'auto_translate': {channel_id: [langs]}}
+        self._flag_maps = {}   # guild_id -> merged flag map
+        self._mtime = None
+        self._checked = 0.0
+
+        self.reloads = 0
+        self.errors = 0
+        self.load()
+
+    def load(self):
+        """(Re)read the file; on errors the previous configuration stays active"""
+        self._checked = time.monotonic()
+        try:
+            mtime = os.path.getmtime(self.path)
+        except OSError:
+            if self._mtime is not None:
+                print(f"⚠️ Server-Konfiguration {self.path} nicht mehr vorhanden, verwende Standardwerte")
+            self._guilds, self._flag_maps, self._mtime = {}, {}, None
+            return
+        if mtime == self._mtime:
+            return
+
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            guilds = {}
+            for guild_id, settings in data.get('guilds', {}).items():
+                guilds[int(guild_id)] = {
+                    'flags': dict(settings.get('flags', {})),
+                    'auto_translate': {
+                        int(channel_id): [str(lang) for lang in languages]
+                        for channel_id, languages in settings.get('auto_translate', {}).items()
+                    }
+                }
+        except (OSError, ValueError, TypeError, AttributeError) as e:
+            self.errors += 1
+            self._mtime = mtime  # do not retry until the file changes again
+            print(f"⚠️ Server-Konfiguration {self.path} fehlerhaft: {e}")
+            return
+
+        self._guilds = guilds
+        self._flag_maps = {}
+        self._mtime = mtime
+        self.reloads += 1
+        print(f"⚙️ Server-Konfiguration geladen: {len(guilds)} Server, {self.auto_channel_count()} Auto-Übersetzungs-Kanäle")
+
+    def _maybe_reload(self):
+        if time.monotonic() - self._checked >= self.reload_interval:
+            self.load()
+
+    def flag_map(self, guild_id):
+        """FLAG_LANG_MAP with the guild's overrides applied"""
+        self._maybe_reload()
+        settings = self._guilds.get(guild_id)
+        if settings is None or not settings['flags']:
+            return self.default_flags
+        flags = self._flag_maps.get(guild_id)
+        if flags is None:
+            flags = dict(self.default_flags)
+            for flag, lang in settings['flags'].items():
+                if lang is None:
+                    flags.pop(flag, None)
+                else:
+                    flags[flag] = lang
+            self._flag_maps[guild_id] = flags
+        return flags
+
+    def auto_languages(self, guild_id, channel_id):
+        """Languages new messages in this channel are pre-translated into (empty if none)"""
+        self._maybe_reload()
+        settings = self._guilds.get(guild_id)
+        if settings is None:
+            return ()
+        return settings['auto_translate'].get(channel_id, ())
+
+    def auto_channel_count(self):
+        return sum(len(settings['auto_translate']) for settings in self._guilds.values())
+
+    def get_stats(self):
+        return {
+            'guilds': len(self._guilds),
+            'flag_overrides': sum(1 for settings in self._guilds.values() if settings['flags']),
+            'auto_channels': self.auto_channel_count(),
+            'reloads': self.reloads,
+            'errors': self.errors
+        }
@@ -0,0 +1,67 @@
+"""
+Guild and user totals for Discord Translation Bot
+Kept up to date incrementally from gateway events instead of summing bot.guilds on every request
+"""
+
+
+class GuildAggregates:
+    """Per-guild member counts and their running total"""
+    def __init__(self):
+        self._members = {}  # guild_id -> member_count
+        self._shards = {}   # guild_id -> shard_id
+        self._shard_guilds = {}  # shard_id -> guild count
+        self.users = 0
+        self.resyncs = 0
+        self.updates = 0
+
+    @property
+    def guilds(self):
+        return len(self._members)
+
+    def _move_shard(self, guild_id, shard_id):
+        previous = self._shards.pop(guild_id, None)
+        if previous is not None:
+            self._shard_guilds[previous] -= 1
+        if shard_id is not None:
+            self._shards[guild_id] = shard_id
+            self._shard_guilds[shard_id] = self._shard_guilds.get(shard_id, 0) + 1
+
+    def reset(self, guilds):
+        """Full recount, only used when the client becomes ready"""
+        self._members = {guild.id: guild.member_count or 0 for guild in guilds}
+        self._shards = {guild.id: guild.shard_id for guild in guilds}
+        self._shard_guilds = {}
+        for shard_id in self._shards.values():
+            self._shard_guilds[shard_id] = self._shard_guilds.get(shard_id, 0) + 1
+        self.users = sum(self._members.values())
+        self.resyncs += 1
+
+    def set_guild(self, guild):
+        """Guild joined or updated"""
+        count = guild.member_count or 0
+        self.users += count - self._members.get(guild.id, 0)
+        self._members[guild.id] = count
+        self._move_shard(guild.id, guild.shard_id)
+        self.updates += 1
+
+    def remove_guild(self, guild_id):
+        self.users -= self._members.pop(guild_id, 0)
+        self._move_shard(guild_id, None)
+        self.updates += 1
+
+    def adjust_members(self, guild_id, delta):
+        """Member joined (+1) or left (-1) a known guild"""
+        if guild_id in self._members:
+            self._members[guild_id] += delta
+            self.users += delta
+            self.updates += 1
+
+    def guilds_by_shard(self):
+        """Guild count per shard id"""
+        return dict(self._shard_guilds)
+
+    def get_stats(self):
+        return {
+            'guilds': self.guilds,
+            'users': self.users
+        }
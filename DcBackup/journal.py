@@ -0,0 +1,225 @@
+"""
+Durable job journal for Discord Translation Bot
+Records accepted translation jobs in an append-only SQLite log (WAL mode) so jobs that were
+interrupted by a restart can be replayed instead of being lost
+"""
+
+import asyncio
+import json
+import sqlite3
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+
+class JobJournal:
+    """Append-only log of 'start' and 'done' records, written by group commit
+
+    start() and complete() only touch memory; a background task commits
+    everything queued within flush_interval in one transaction on a
+    dedicated thread. A job that finishes before its group is committed is
+    never written at all. Without open() the journal works in memory only
+    (deduplication, no durability).
+    """
+    def __init__(self, flush_interval=0.05, prune_interval=60):
+        self.path = None
+        self.flush_interval = flush_interval
+        self.prune_interval = prune_interval
+        self._db = None
+        self._io = None
+        self._next_id = 1
+        self._active = {}     # key -> job_id of started, unfinished jobs
+        self._keys = {}       # job_id -> key
+        self._pending = {}    # (job_id, event) -> (job_id, event, ts, data); insertion ordered
+        self._pending_since = None
+        self._replay = []     # (job_id, data) loaded by open()
+        self._wakeup = None
+        self._task = None
+        self._last_prune = 0.0
+
+        self.started = 0
+        self.completed = 0
+        self.duplicates = 0
+        self.elided = 0
+        self.commits = 0
+        self.rows_written = 0
+        self.last_commit_ms = 0.0
+        self.errors = 0
+        self.replayed = 0
+        self.replay_deduped = 0
+        self.replay_expired = 0
+
+    def open(self, path, replay_max_age=3600):
+        """Open (or create) the journal file and load unfinished jobs for take_replay()"""
+        self.path = path
+        try:
+            db = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+            db.execute("PRAGMA journal_mode=WAL")
+            # NORMAL: a commit survives a crash of the process, only power loss can drop the last group
+            db.execute("PRAGMA synchronous=NORMAL")
+            db.execute(
+                "CREATE TABLE IF NOT EXISTS jobs ("
+                "seq INTEGER PRIMARY KEY, job_id INTEGER NOT NULL, event TEXT NOT NULL, "
+                "ts REAL NOT NULL, data TEXT)"
+            )
+            db.execute("CREATE INDEX IF NOT EXISTS jobs_job_id ON jobs (job_id)")
+            rows = db.execute(
+                "SELECT job_id, ts, data FROM jobs WHERE event = 'start' AND job_id NOT IN "
+                "(SELECT job_id FROM jobs WHERE event = 'done') ORDER BY seq"
+            ).fetchall()
+            last_id = db.execute("SELECT MAX(job_id) FROM jobs").fetchone()[0]
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"⚠️ Job-Journal {path} nicht verfügbar, arbeite ohne: {e}")
+            return
+
+        self._db = db
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='job-journal')
+        self._next_id = max(self._next_id, (last_id or 0) + 1)
+
+        now = time.time()
+        seen = set()
+        for job_id, ts, data in rows:
+            record = json.loads(data)
+            key = tuple(record['key'])
+            if now - ts > replay_max_age:
+                self.replay_expired += 1
+                self._finish(job_id, 'expired')
+            elif key in seen or key in self._active:
+                self.replay_deduped += 1
+                self._finish(job_id, 'duplicate')
+            else:
+                seen.add(key)
+                self._active[key] = job_id
+                self._keys[job_id] = key
+                self._replay.append((job_id, record['data']))
+        self._write(self._take_pending())
+        if rows:
+            print(f"📒 Job-Journal: {len(self._replay)} unterbrochene Jobs, "
+                  f"{self.replay_deduped} doppelt, {self.replay_expired} abgelaufen")
+
+    def take_replay(self):
+        """Unfinished jobs of the previous run as (job_id, data); returned only once"""
+        jobs, self._replay = self._replay, []
+        self.replayed += len(jobs)
+        return jobs
+
+    def start(self, key, data):
+        """Record a new job; returns its id, or None if a job with the same key is still running"""
+        if key in self._active:
+            self.duplicates += 1
+            return None
+        job_id = self._next_id
+        self._next_id += 1
+        self._active[key] = job_id
+        self._keys[job_id] = key
+        self.started += 1
+        self._queue((job_id, 'start', time.time(), json.dumps({'key': list(key), 'data': data})))
+        return job_id
+
+    def complete(self, job_id, outcome='done'):
+        """Mark a job finished (delivered, failed or skipped); it will not be replayed"""
+        key = self._keys.pop(job_id, None)
+        if key is None:
+            return  # unknown or already completed
+        del self._active[key]
+        self.completed += 1
+        self._finish(job_id, outcome)
+
+    def _finish(self, job_id, outcome):
+        if self._pending.pop((job_id, 'start'), None) is not None:
+            self.elided += 1  # finished before its group was committed: nothing to write
+            if not self._pending:
+                self._pending_since = None
+            return
+        self._queue((job_id, 'done', time.time(), json.dumps({'outcome': outcome})))
+
+    def _queue(self, row):
+        if self._db is None:
+            return
+        if not self._pending:
+            self._pending_since = time.monotonic()
+        self._pending[row[:2]] = row
+        if self._wakeup is None:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return  # during open(): written synchronously
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        self._wakeup.set()
+
+    def _take_pending(self):
+        rows = list(self._pending.values())
+        self._pending.clear()
+        self._pending_since = None
+        return rows
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            await self._wakeup.wait()
+            # gather everything that arrives within the interval into one commit
+            await asyncio.sleep(self.flush_interval)
+            self._wakeup.clear()
+            rows = self._take_pending()
+            if rows:
+                await loop.run_in_executor(self._io, self._write, rows)
+
+    def _write(self, rows):
+        if not rows:
+            return
+        start = time.perf_counter()
+        try:
+            self._db.execute("BEGIN")
+            try:
+                self._db.executemany("INSERT INTO jobs (job_id, event, ts, data) VALUES (?, ?, ?, ?)", rows)
+                if time.monotonic() - self._last_prune >= self.prune_interval:
+                    self._last_prune = time.monotonic()
+                    # finished jobs are never needed again
+                    self._db.execute(
+                        "DELETE FROM jobs WHERE job_id IN (SELECT job_id FROM jobs WHERE event = 'done')"
+                    )
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+        except sqlite3.Error as e:
+            self.errors += 1
+            print(f"⚠️ Job-Journal konnte nicht geschrieben werden: {e}")
+            return
+        self.commits += 1
+        self.rows_written += len(rows)
+        self.last_commit_ms = (time.perf_counter() - start) * 1000
+
+    def close(self):
+        """Commit what is still queued and close the file"""
+        if self._task is not None:
+            self._task.cancel()
+        if self._db is None:
+            return
+        if self._io is not None:
+            self._io.shutdown(wait=True)
+        self._write(self._take_pending())
+        self._db.close()
+        self._db = None
+
+    def get_stats(self):
+        pending_since = self._pending_since
+        return {
+            'enabled': self._db is not None,
+            'active': len(self._active),
+            'pending_writes': len(self._pending),
+            'lag_seconds': round(time.monotonic() - pending_since, 3) if pending_since is not None else 0.0,
+            'started': self.started,
+            'completed': self.completed,
+            'duplicates': self.duplicates,
+            'elided': self.elided,
+            'commits': self.commits,
+            'rows_written': self.rows_written,
+            'rows_per_commit': round(self.rows_written / self.commits, 1) if self.commits else 0.0,
+            'last_commit_ms': round(self.last_commit_ms, 2),
+            'errors': self.errors,
+            'replayed': self.replayed,
+            'replay_deduped': self.replay_deduped,
+            'replay_expired': self.replay_expired
+        }
@@ -0,0 +1,247 @@
+"""
+Offline language identification for Discord Translation Bot
+Unicode script rules plus a compact character-trigram model for Latin and Cyrillic languages
+"""
+
+import math
+import re
+from collections import Counter, OrderedDict
+
+# Short samples of everyday text; their trigram frequencies form the model
+_SAMPLES = {
+    'en': "the quick brown fox jumps over the lazy dog. we are going to the meeting tonight and you should "
+          "come with us. what do you think about this idea? it is not that easy but we will try. thank you "
+          "for your help, i would like to know when the new update is coming out and which features it has.",
+    'de': "der schnelle braune fuchs springt über den faulen hund. wir gehen heute abend zu dem treffen und du "
+          "solltest mitkommen. was denkst du über diese idee? es ist nicht so einfach, aber wir werden es "
+          "versuchen. vielen dank für deine hilfe, ich möchte wissen, wann das neue update kommt und welche "
+          "funktionen es hat. ich bin nicht sicher, ob das richtig ist.",
+    'fr': "le renard brun rapide saute par-dessus le chien paresseux. nous allons à la réunion ce soir et tu "
+          "devrais venir avec nous. que penses-tu de cette idée? ce n'est pas si facile mais nous allons "
+          "essayer. merci pour ton aide, je voudrais savoir quand la nouvelle mise à jour sortira et quelles "
+          "sont les fonctions qu'elle contient.",
+    'es': "el rápido zorro marrón salta sobre el perro perezoso. vamos a la reunión esta noche y deberías "
+          "venir con nosotros. ¿qué piensas de esta idea? no es tan fácil pero lo vamos a intentar. gracias "
+          "por tu ayuda, me gustaría saber cuándo sale la nueva actualización y qué funciones tiene.",
+    'it': "la veloce volpe marrone salta sopra il cane pigro. stasera andiamo alla riunione e dovresti venire "
+          "con noi. cosa ne pensi di questa idea? non è così facile ma ci proveremo. grazie per il tuo aiuto, "
+          "vorrei sapere quando esce il nuovo aggiornamento e quali funzioni ha.",
+    'nl': "de snelle bruine vos springt over de luie hond. we gaan vanavond naar de vergadering en je zou "
+          "met ons mee moeten komen. wat vind jij van dit idee? het is niet zo makkelijk maar we gaan het "
+          "proberen. bedankt voor je hulp, ik zou graag willen weten wanneer de nieuwe update uitkomt en "
+          "welke functies het heeft.",
+    'pt': "a rápida raposa marrom pula sobre o cão preguiçoso. nós vamos à reunião hoje à noite e você "
+          "deveria vir conosco. o que você acha desta ideia? não é tão fácil, mas vamos tentar. obrigado "
+          "pela sua ajuda, eu gostaria de saber quando sai a nova atualização e quais funções ela tem.",
+    'sv': "den snabba bruna räven hoppar över den lata hunden. vi ska gå på mötet i kväll och du borde "
+          "följa med oss. vad tycker du om den här idén? det är inte så lätt men vi ska försöka. tack för "
+          "din hjälp, jag skulle vilja veta när den nya uppdateringen kommer och vilka funktioner den har.",
+    'no': "den raske brune reven hopper over den late hunden. vi skal på møtet i kveld og du burde bli med "
+          "oss. hva synes du om denne ideen? det er ikke så lett, men vi skal prøve. takk for hjelpen, jeg "
+          "vil gjerne vite når den nye oppdateringen kommer og hvilke funksjoner den har. jeg er ikke sikker.",
+    'da': "den hurtige brune ræv hopper over den dovne hund. vi skal til mødet i aften, og du burde komme "
+          "med os. hvad synes du om denne idé? det er ikke så nemt, men vi vil prøve. tak for din hjælp, jeg "
+          "vil gerne vide, hvornår den nye opdatering kommer, og hvilke funktioner den har. jeg er ikke sikker.",
+    'fi': "nopea ruskea kettu hyppää laiskan koiran yli. menemme tänä iltana kokoukseen ja sinun pitäisi "
+          "tulla mukaan. mitä mieltä olet tästä ideasta? se ei ole niin helppoa, mutta yritämme. kiitos "
+          "avustasi, haluaisin tietää milloin uusi päivitys tulee ja mitä ominaisuuksia siinä on.",
+    'pl': "szybki brązowy lis przeskakuje nad leniwym psem. idziemy dziś wieczorem na spotkanie i powinieneś "
+          "pójść z nami. co myślisz o tym pomyśle? to nie jest takie łatwe, ale spróbujemy. dziękuję za "
+          "pomoc, chciałbym wiedzieć, kiedy wyjdzie nowa aktualizacja i jakie ma funkcje.",
+    'cs': "rychlá hnědá liška skáče přes líného psa. dnes večer jdeme na schůzku a měl bys jít s námi. co si "
+          "myslíš o tomto nápadu? není to tak jednoduché, ale zkusíme to. děkuji za pomoc, chtěl bych vědět, "
+          "kdy vyjde nová aktualizace a jaké má funkce. nejsem si jistý, jestli je to správně.",
+    'sk': "rýchla hnedá líška skáče cez lenivého psa. dnes večer ideme na stretnutie a mal by si ísť s nami. "
+          "čo si myslíš o tomto nápade? nie je to také jednoduché, ale skúsime to. ďakujem za pomoc, chcel by "
+          "som vedieť, kedy vyjde nová aktualizácia a aké má funkcie. nie som si istý, či je to správne.",
+    'hu': "a gyors barna róka átugrik a lusta kutya felett. ma este megyünk a találkozóra, és neked is "
+          "jönnöd kellene velünk. mit gondolsz erről az ötletről? nem olyan egyszerű, de megpróbáljuk. "
+          "köszönöm a segítséget, szeretném tudni, mikor jön az új frissítés és milyen funkciói vannak.",
+    'tr': "hızlı kahverengi tilki tembel köpeğin üzerinden atlar. bu akşam toplantıya gidiyoruz ve sen de "
+          "bizimle gelmelisin. bu fikir hakkında ne düşünüyorsun? o kadar kolay değil ama deneyeceğiz. "
+          "yardımın için teşekkür ederim, yeni güncellemenin ne zaman çıkacağını ve hangi özellikleri "
+          "olduğunu bilmek istiyorum.",
+    'vi': "con cáo nâu nhanh nhẹn nhảy qua con chó lười. tối nay chúng tôi sẽ đi họp và bạn nên đi cùng "
+          "chúng tôi. bạn nghĩ gì về ý tưởng này? không dễ như vậy nhưng chúng tôi sẽ thử. cảm ơn bạn đã "
+          "giúp đỡ, tôi muốn biết khi nào bản cập nhật mới ra mắt và nó có những tính năng gì.",
+    'id': "rubah cokelat yang cepat melompati anjing yang malas. kami akan pergi ke pertemuan malam ini dan "
+          "kamu harus ikut dengan kami. apa pendapatmu tentang ide ini? tidak semudah itu tetapi kami akan "
+          "mencoba. terima kasih atas bantuanmu, saya ingin tahu kapan pembaruan baru keluar dan fitur apa "
+          "saja yang dimilikinya. saya tidak yakin apakah itu benar.",
+    'ms': "musang coklat yang pantas melompat ke atas anjing yang malas. kami akan pergi ke mesyuarat malam "
+          "ini dan awak patut ikut bersama kami. apa pendapat awak tentang idea ini? ia tidak semudah itu "
+          "tetapi kami akan cuba. terima kasih atas bantuan awak, saya ingin tahu bila kemas kini baharu "
+          "akan keluar dan apakah ciri-cirinya. saya tidak pasti sama ada itu betul.",
+    'ro': "vulpea maro și rapidă sare peste câinele leneș. mergem diseară la întâlnire și ar trebui să vii "
+          "cu noi. ce crezi despre această idee? nu este atât de ușor, dar vom încerca. mulțumesc pentru "
+          "ajutor, aș vrea să știu când apare noua actualizare și ce funcții are.",
+    'hr': "brza smeđa lisica skače preko lijenog psa. večeras idemo na sastanak i trebao bi poći s nama. "
+          "što misliš o ovoj ideji? nije tako jednostavno, ali pokušat ćemo. hvala na pomoći, želio bih "
+          "znati kada izlazi novo ažuriranje i koje funkcije ima. nisam siguran je li to točno.",
+    'sl': "hitra rjava lisica skoči čez lenega psa. nocoj gremo na sestanek in moral bi iti z nami. kaj "
+          "misliš o tej ideji? ni tako preprosto, vendar bomo poskusili. hvala za pomoč, rad bi vedel, kdaj "
+          "izide nova posodobitev in katere funkcije ima. nisem prepričan, ali je to pravilno.",
+    'lt': "greita ruda lapė peršoka per tingų šunį. šį vakarą einame į susitikimą ir tu turėtum eiti kartu "
+          "su mumis. ką manai apie šią idėją? tai nėra taip lengva, bet mes pabandysime. ačiū už pagalbą, "
+          "norėčiau žinoti, kada pasirodys naujas atnaujinimas ir kokias funkcijas jis turi.",
+    'lv': "ātrā brūnā lapsa pārlec pāri slinkajam sunim. šovakar mēs ejam uz sapulci, un tev vajadzētu nākt "
+          "mums līdzi. ko tu domā par šo ideju? tas nav tik vienkārši, bet mēs mēģināsim. paldies par "
+          "palīdzību, es gribētu zināt, kad iznāks jaunais atjauninājums un kādas funkcijas tam ir.",
+    'et': "kiire pruun rebane hüppab üle laisa koera. me läheme täna õhtul koosolekule ja sa peaksid meiega "
+          "tulema. mida sa sellest ideest arvad? see ei ole nii lihtne, aga me proovime. aitäh abi eest, ma "
+          "tahaksin teada, millal uus uuendus välja tuleb ja millised funktsioonid sellel on.",
+    'ru': "быстрая коричневая лиса прыгает через ленивую собаку. сегодня вечером мы идём на встречу, и тебе "
+          "стоит пойти с нами. что ты думаешь об этой идее? это не так просто, но мы попробуем. спасибо за "
+          "помощь, я хотел бы знать, когда выйдет новое обновление и какие в нём функции.",
+    'uk': "швидка коричнева лисиця стрибає через ледачого пса. сьогодні ввечері ми йдемо на зустріч, і тобі "
+          "варто піти з нами. що ти думаєш про цю ідею? це не так просто, але ми спробуємо. дякую за "
+          "допомогу, я хотів би знати, коли вийде нове оновлення і які в ньому функції.",
+    'bg': "бързата кафява лисица прескача мързеливото куче. тази вечер отиваме на срещата и трябва да дойдеш "
+          "с нас. какво мислиш за тази идея? не е толкова лесно, но ще опитаме. благодаря за помощта, бих "
+          "искал да знам кога ще излезе новата актуализация и какви функции има.",
+    'sr': "брза смеђа лисица скаче преко лењог пса. вечерас идемо на састанак и требало би да пођеш са нама. "
+          "шта мислиш о овој идеји? није тако једноставно, али покушаћемо. хвала на помоћи, желео бих да "
+          "знам када излази ново ажурирање и које функције има.",
+}
+
+# Scripts that identify a language on their own (checked by share of letters)
+_SCRIPT_LANGS = (
+    ('ko', re.compile(r'[\uac00-\ud7af\u1100-\u11ff]')),
+    ('ja', re.compile(r'[\u3040-\u30ff]')),
+    ('th', re.compile(r'[\u0e00-\u0e7f]')),
+    ('he', re.compile(r'[\u0590-\u05ff]')),
+    ('el', re.compile(r'[\u0370-\u03ff]')),
+    ('hi', re.compile(r'[\u0900-\u097f]')),
+)
+_HAN = re.compile(r'[\u4e00-\u9fff]')
+_ARABIC = re.compile(r'[\u0600-\u06ff]')
+_PERSIAN_LETTERS = re.compile(r'[پچژگکی]')
+_CYRILLIC = re.compile(r'[\u0400-\u04ff]')
+
+# Letters only used by a few of the supported languages; soft evidence, since loanwords and
+# names carry them into other languages too (Müller, jalapeño)
+_LETTER_HINTS = {
+    'ß': 'de', 'ü': 'de tr hu et', 'ä': 'de sv fi et sk', 'ö': 'de sv fi hu tr et',
+    'å': 'sv no da', 'æ': 'no da', 'ø': 'no da',
+    'ñ': 'es', 'ã': 'pt vi', 'õ': 'pt et vi', 'œ': 'fr', 'ç': 'fr pt tr', 'ê': 'fr pt vi',
+    'ł': 'pl', 'ą': 'pl lt', 'ę': 'pl lt', 'ś': 'pl', 'ź': 'pl', 'ż': 'pl', 'ń': 'pl',
+    'ý': 'cs sk', 'ř': 'cs', 'ů': 'cs', 'ě': 'cs', 'ľ': 'sk', 'ĺ': 'sk', 'ŕ': 'sk', 'ô': 'sk fr pt vi',
+    'ő': 'hu', 'ű': 'hu', 'ă': 'ro vi', 'ș': 'ro', 'ț': 'ro', 'ş': 'ro tr', 'ţ': 'ro',
+    'ğ': 'tr', 'ı': 'tr', 'ā': 'lv', 'ē': 'lv', 'ī': 'lv', 'ķ': 'lv', 'ļ': 'lv', 'ņ': 'lv', 'ģ': 'lv',
+    'ū': 'lv lt', 'ė': 'lt', 'ų': 'lt', 'į': 'lt', 'đ': 'hr vi', 'ć': 'hr pl', 'ơ': 'vi', 'ư': 'vi',
+    'і': 'uk', 'ї': 'uk', 'є': 'uk', 'ґ': 'uk', 'ы': 'ru', 'э': 'ru', 'ё': 'ru',
+    'ђ': 'sr', 'ћ': 'sr', 'џ': 'sr', 'ј': 'sr', 'љ': 'sr', 'њ': 'sr',
+}
+
+# Log-likelihood bonus per occurrence of a hint letter for the languages that use it
+_HINT_BONUS = 1.5
+
+# Discord markup that says nothing about the language
+_NOISE = re.compile(r'```.*?```|`[^`]*`|https?://\S+|<a?:\w+:\d+>|<[@#][!&]?\d+>|<t:\d+(?::\w)?>', re.S)
+_NON_LETTERS = re.compile(r"[^\w']+|[\d_]+")
+
+
+def _trigrams(text):
+    counts = Counter()
+    for word in _NON_LETTERS.sub(' ', text.lower()).split():
+        padded = f" {word} "
+        for i in range(len(padded) - 2):
+            counts[padded[i:i + 3]] += 1
+    return counts
+
+
+def _log_profile(counts, alpha=0.5, vocabulary=20000):
+    """Smoothed log-probabilities of each trigram, plus the value for unseen trigrams"""
+    total = sum(counts.values()) + alpha * vocabulary
+    return {gram: math.log((v + alpha) / total) for gram, v in counts.items()}, math.log(alpha / total)
+
+
+class LanguageDetector:
+    """Detects the language of message text and remembers the result per message"""
+    def __init__(self, min_confidence=0.3, min_letters=12, min_trigrams=30, max_chars=1000, cache_size=10000):
+        self.min_confidence = min_confidence
+        self.min_letters = min_letters
+        self.min_trigrams = min_trigrams
+        self.max_chars = max_chars
+        self.cache_size = cache_size
+        self._profiles = {lang: _log_profile(_trigrams(sample)) for lang, sample in _SAMPLES.items()}
+        self._cyrillic = ('ru', 'uk', 'bg', 'sr')
+        self._latin = tuple(lang for lang in self._profiles if lang not in self._cyrillic)
+        self._cache = OrderedDict()  # message_id -> lang or None
+
+        self.detections = 0
+        self.cache_hits = 0
+        self.undetermined = 0
+        self.upstream_saved = 0
+
+    def detect(self, text):
+        """Return a language code (googletrans style) or None if unsure"""
+        self.detections += 1
+        text = _NOISE.sub(' ', text[:self.max_chars])
+        letters = [char for char in text if char.isalpha()]
+        if len(letters) < self.min_letters:
+            self.undetermined += 1
+            return None
+        joined = ''.join(letters)
+
+        for lang, pattern in _SCRIPT_LANGS:
+            if len(pattern.findall(joined)) > len(letters) * 0.3:
+                return lang
+        if len(_HAN.findall(joined)) > len(letters) * 0.5:
+            # simplified vs traditional is not decidable here, never skip zh-cn/zh-tw
+            self.undetermined += 1
+            return None
+        if len(_ARABIC.findall(joined)) > len(letters) * 0.5:
+            return 'fa' if _PERSIAN_LETTERS.search(joined) else 'ar'
+
+        candidates = self._cyrillic if len(_CYRILLIC.findall(joined)) > len(letters) * 0.5 else self._latin
+        bonus = Counter()
+        for letter, count in Counter(joined.lower()).items():
+            for hinted in _LETTER_HINTS.get(letter, '').split():
+                bonus[hinted] += count * _HINT_BONUS
+        lang = self._classify(text, candidates, bonus)
+        if lang is None:
+            self.undetermined += 1
+        return lang
+
+    def _classify(self, text, candidates, bonus):
+        """Best candidate of the whole script group, or None unless it clearly beats the runner-up"""
+        grams = _trigrams(text)
+        total = sum(grams.values())
+        # a chat line of a few words matches the small samples by chance (e.g. English -> de at 0.2)
+        if not total or total < self.min_trigrams:
+            return None
+        scores = []
+        for lang in candidates:
+            profile, unseen = self._profiles[lang]
+            score = sum(count * profile.get(gram, unseen) for gram, count in grams.items())
+            scores.append((score + bonus.get(lang, 0.0), lang))
+        scores.sort(reverse=True)
+        # average log-likelihood margin per trigram; close calls (e.g. no/da, cs/sk) stay undecided
+        if (scores[0][0] - scores[1][0]) / total < self.min_confidence:
+            return None
+        return scores[0][1]
+
+    def detect_message(self, message_id, text):
+        """detect() with the result cached per message"""
+        if message_id in self._cache:
+            self.cache_hits += 1
+            self._cache.move_to_end(message_id)
+            return self._cache[message_id]
+        lang = self.detect(text)
+        self._cache[message_id] = lang
+        if len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return lang
+
+    def forget(self, message_id):
+        self._cache.pop(message_id, None)
+
+    def get_stats(self):
+        return {
+            'detections': self.detections,
+            'cache_hits': self.cache_hits,
+            'cached_messages': len(self._cache),
+            'undetermined': self.undetermined,
+            'upstream_saved': self.upstream_saved
+        }
@@ -5,34 +5,213 @@ Simplified version based on user's bot code
 """
 
 import discord
-from googletrans import Translator
+from discord import app_commands
+import asyncio
+import functools
 import os
-from dotenv import load_dotenv
-import threading
+import signal
+from dotenv import load_dotenv, find_dotenv
 import time
-from web_monitor import create_web_app, set_bot_instance
+from web_monitor import start_web_server, set_bot_instance, stats_stream, stats_history
+from translation_service import TranslationService, SingleFlight
+from translation_backends import create_backend, TokenBucket, CircuitBreaker, TranslationUnavailable
+from translation_cache import TranslationCache
+from message_cache import MessageCache
+from scheduler import FairScheduler, QuotaExceeded
+from outbox import Outbox, build_payloads
+from language_detection import LanguageDetector
+from segmenter import MessageSegmenter
+from guild_config import GuildConfig
+from prewarm import Prewarmer
+from journal import JobJournal
+from metrics import MetricsRegistry
+from guild_stats import GuildAggregates
+from memory_stats import MemoryStats
+from sharding import ShardLauncher, SharedTokenBucket, ShardedStats, WorkerStatsStore, shard_of
 
-# .env laden
-load_dotenv()
+# .env laden (gesucht ab dem Ordner von main.py, wie load_dotenv() es ohne Pfad tut)
+DOTENV_PATH = find_dotenv()
+load_dotenv(DOTENV_PATH)
+# Ordner für Konfigurationsdateien: neben der .env, ohne .env neben main.py
+CONFIG_DIR = os.path.dirname(DOTENV_PATH) or os.path.dirname(os.path.abspath(__file__))
 TOKEN = os.getenv("DISCORD_TOKEN")
 
 if not TOKEN:
     print("⚠️ DISCORD_TOKEN ist nicht gesetzt! Bitte .env Datei erstellen oder Secrets hinzufügen.")
 
+# Übersetzungs-Backend mit Rate-Limit und Circuit Breaker
+TRANSLATION_BACKEND = os.getenv("TRANSLATION_BACKEND", "googletrans")
+TRANSLATION_RATE_LIMIT = float(os.getenv("TRANSLATION_RATE_LIMIT", "5"))
+TRANSLATION_RATE_BURST = int(os.getenv("TRANSLATION_RATE_BURST", "10"))
+TRANSLATION_RATE_MAX_WAIT = float(os.getenv("TRANSLATION_RATE_MAX_WAIT", "10"))
+BREAKER_FAILURE_THRESHOLD = int(os.getenv("BREAKER_FAILURE_THRESHOLD", "5"))
+BREAKER_RESET_TIMEOUT = float(os.getenv("BREAKER_RESET_TIMEOUT", "30"))
+
+# Übersetzungs-Worker (blockierende Aufrufe laufen außerhalb des Event-Loops)
+TRANSLATION_WORKERS = int(os.getenv("TRANSLATION_WORKERS", "4"))
+TRANSLATION_MAX_CONCURRENT = int(os.getenv("TRANSLATION_MAX_CONCURRENT", str(TRANSLATION_WORKERS)))
+TRANSLATION_MAX_QUEUE = int(os.getenv("TRANSLATION_MAX_QUEUE", "100"))
+# Obergrenze; Backends ohne Bulk-Endpunkt (googletrans) bündeln nie
+TRANSLATION_BATCH_SIZE = int(os.getenv("TRANSLATION_BATCH_SIZE", "10"))
+TRANSLATION_BATCH_WAIT_MS = int(os.getenv("TRANSLATION_BATCH_WAIT_MS", "20"))
+# Lange Nachrichten werden satzweise in Segmente unter dieser Länge geteilt
+TRANSLATION_SEGMENT_MAX_CHARS = int(os.getenv("TRANSLATION_SEGMENT_MAX_CHARS", "1500"))
+
+# Übersetzungs-Cache (Speicher + SQLite auf der Festplatte)
+TRANSLATION_CACHE_SIZE = int(os.getenv("TRANSLATION_CACHE_SIZE", "5000"))
+TRANSLATION_CACHE_TTL = int(os.getenv("TRANSLATION_CACHE_TTL", "3600"))
+TRANSLATION_CACHE_DB = os.getenv("TRANSLATION_CACHE_DB", "translation_cache.db")
+TRANSLATION_CACHE_DISK_SIZE = int(os.getenv("TRANSLATION_CACHE_DISK_SIZE", "100000"))
+TRANSLATION_CACHE_DISK_TTL = int(os.getenv("TRANSLATION_CACHE_DISK_TTL", str(30 * 86400)))
+
+# Cache für Nachrichteninhalte (spart fetch_message bei Reaktionen)
+MESSAGE_CACHE_SIZE = int(os.getenv("MESSAGE_CACHE_SIZE", "10000"))
+MESSAGE_CACHE_MAX_AGE = int(os.getenv("MESSAGE_CACHE_MAX_AGE", "86400"))
+
+# Faire Verteilung: Kontingente pro Nutzer/Server, gewichtete Warteschlangen pro Server
+SCHEDULER_CONCURRENCY = int(os.getenv("SCHEDULER_CONCURRENCY", "8"))
+USER_QUOTA_RATE = float(os.getenv("USER_QUOTA_RATE", "0.2"))      # Übersetzungen pro Sekunde
+USER_QUOTA_BURST = int(os.getenv("USER_QUOTA_BURST", "5"))
+GUILD_QUOTA_RATE = float(os.getenv("GUILD_QUOTA_RATE", "2"))
+GUILD_QUOTA_BURST = int(os.getenv("GUILD_QUOTA_BURST", "20"))
+GUILD_MAX_QUEUE = int(os.getenv("GUILD_MAX_QUEUE", "50"))
+# Format: "guild_id:gewicht,guild_id:gewicht"
+GUILD_WEIGHTS = {
+    int(guild_id): float(weight)
+    for guild_id, weight in (item.split(":") for item in os.getenv("GUILD_WEIGHTS", "").split(",") if item.strip())
+}
+
+# DM-Outbox (Senden und Reaktionen entfernen im Hintergrund)
+OUTBOX_WORKERS = int(os.getenv("OUTBOX_WORKERS", "4"))
+OUTBOX_MAX_RETRIES = int(os.getenv("OUTBOX_MAX_RETRIES", "3"))
+
+# Lokale Spracherkennung (überspringt Übersetzungen in die Ausgangssprache)
+LANGUAGE_DETECTION = os.getenv("LANGUAGE_DETECTION", "true").lower() in ("1", "true", "yes")
+LANGUAGE_DETECTION_MIN_CONFIDENCE = float(os.getenv("LANGUAGE_DETECTION_MIN_CONFIDENCE", "0.3"))
+LANGUAGE_DETECTION_MIN_TRIGRAMS = int(os.getenv("LANGUAGE_DETECTION_MIN_TRIGRAMS", "30"))
+
+# Server-Konfiguration (Flaggen pro Server, Auto-Übersetzungs-Kanäle) neben der .env
+GUILD_CONFIG_PATH = os.getenv("GUILD_CONFIG_PATH", os.path.join(CONFIG_DIR, "guild_config.json"))
+PREWARM_MAX_PENDING = int(os.getenv("PREWARM_MAX_PENDING", "500"))
+PREWARM_BATCH_SIZE = int(os.getenv("PREWARM_BATCH_SIZE", "10"))
+
+# App-Commands ("Translate message" im Kontextmenü, /translate) mit kurzlebigen Antworten
+APP_COMMANDS_SYNC = os.getenv("APP_COMMANDS_SYNC", "true").lower() in ("1", "true", "yes")
+# Discord verlangt eine Antwort binnen 3 Sekunden, danach wird erst bestätigt und nachgereicht
+APP_COMMAND_FAST_REPLY = float(os.getenv("APP_COMMAND_FAST_REPLY", "2.5"))
+
+# Job-Journal: angenommene Reaktionen überstehen einen Neustart und werden danach nachgeholt
+JOURNAL_PATH = os.getenv("JOURNAL_PATH", "job_journal.db")  # leer = nur im Speicher
+JOURNAL_FLUSH_INTERVAL = float(os.getenv("JOURNAL_FLUSH_INTERVAL", "0.05"))  # Sammelzeit pro Commit
+JOURNAL_REPLAY_MAX_AGE = int(os.getenv("JOURNAL_REPLAY_MAX_AGE", "3600"))
+JOURNAL_REPLAY_CONCURRENCY = int(os.getenv("JOURNAL_REPLAY_CONCURRENCY", "4"))
+
+# Statistiken werden im Event-Loop gesammelt und als Snapshot veröffentlicht
+STATS_SNAPSHOT_INTERVAL = float(os.getenv("STATS_SNAPSHOT_INTERVAL", "2"))
+STATS_HISTORY_PATH = os.getenv("STATS_HISTORY_PATH", "stats_history.json")
+STATS_HISTORY_SAVE_INTERVAL = float(os.getenv("STATS_HISTORY_SAVE_INTERVAL", "300"))
+
+# Sharding: mit SHARD_WORKERS > 1 startet main.py als Launcher mehrere Worker-Prozesse,
+# die Worker bekommen WORKER_ID, SHARD_IDS und SHARD_COUNT vom Launcher
+SHARD_WORKERS = int(os.getenv("SHARD_WORKERS", "1"))
+SHARD_COUNT = int(os.getenv("SHARD_COUNT", "0")) or SHARD_WORKERS
+SHARD_IDS = [int(shard_id) for shard_id in os.getenv("SHARD_IDS", "").split(",") if shard_id.strip()]
+WORKER_ID = int(os.getenv("WORKER_ID")) if os.getenv("WORKER_ID") else None
+SHARED_STATE_DB = os.getenv("SHARED_STATE_DB", "shared_state.db")
+
+# Speicherprofil: LOW_MEMORY cached nur, was die Reaktions-Pipeline braucht (IDs, payload.member)
+LOW_MEMORY = os.getenv("LOW_MEMORY", "false").lower() in ("1", "true", "yes")
+# Nachrichten-Cache von discord.py (0 = aus); unser MessageCache hält ohnehin nur den Text
+CLIENT_MAX_MESSAGES = int(os.getenv("CLIENT_MAX_MESSAGES", "0" if LOW_MEMORY else "1000")) or None
+MEMORY_STATS_INTERVAL = float(os.getenv("MEMORY_STATS_INTERVAL", "30"))
+
 # Intents setzen
-intents = discord.Intents.default()
+if LOW_MEMORY:
+    # nur Server, Server-Nachrichten und Server-Reaktionen: keine DMs, Typing, Voice, Einladungen, Emojis, ...
+    intents = discord.Intents.none()
+    intents.guilds = True
+    intents.guild_messages = True
+    intents.guild_reactions = True
+else:
+    intents = discord.Intents.default()
+    intents.reactions = True
 intents.message_content = True
-intents.reactions = True
 
-bot = discord.Client(intents=intents)
-translator = Translator()
+client_options = {'intents': intents, 'max_messages': CLIENT_MAX_MESSAGES}
+if LOW_MEMORY:
+    # keine Mitglieder cachen und beim Start nicht nachladen
+    client_options['member_cache_flags'] = discord.MemberCacheFlags.none()
+    client_options['chunk_guilds_at_startup'] = False
 
-# Bot statistics for web monitor
-bot_stats = {
-    'translations': 0,
-    'errors': 0,
-    'status': 'Stopped'
-}
+if SHARD_IDS:
+    bot = discord.AutoShardedClient(shard_ids=SHARD_IDS, shard_count=SHARD_COUNT, **client_options)
+else:
+    bot = discord.Client(**client_options)
+tree = app_commands.CommandTree(bot)
+
+# Metriken (thread-sicher, werden vom Web-Monitor gelesen)
+metrics = MetricsRegistry()
+translations_total = metrics.counter('translationbot_translations_total', 'Eingereihte Übersetzungs-DMs')
+errors_total = metrics.counter('translationbot_errors_total', 'Fehlgeschlagene oder übersprungene Übersetzungen', ('reason',))
+reactions_total = metrics.counter('translationbot_reactions_total', 'Verarbeitete Flaggen-Reaktionen')
+reactions_replayed_total = metrics.counter('translationbot_reactions_replayed_total', 'Nach einem Neustart aus dem Journal nachgeholte Reaktionen')
+stage_latency = metrics.histogram(
+    'translationbot_stage_seconds', 'Dauer der einzelnen Schritte einer Reaktion', ('stage',)
+)
+REACTION_STAGES = ('channel_lookup', 'fetch_message', 'translate', 'dm_send', 'reaction_remove', 'interaction_reply')
+interactions_total = metrics.counter('translationbot_interactions_total', 'Beantwortete App-Commands', ('command', 'reply'))
+INTERACTION_COMMANDS = ('translate_message', 'translate')
+INTERACTION_REPLIES = ('immediate', 'deferred', 'failed')
+shard_translations_total = metrics.counter('translationbot_shard_translations_total', 'Eingereihte Übersetzungs-DMs pro Shard', ('shard',))
+
+translation_backend = create_backend(TRANSLATION_BACKEND)
+translation_rate_limiter = None
+if TRANSLATION_RATE_LIMIT > 0 and WORKER_ID is not None:
+    # alle Worker teilen sich ein Rate-Limit-Budget
+    translation_rate_limiter = SharedTokenBucket(
+        SHARED_STATE_DB, 'translation', TRANSLATION_RATE_LIMIT, TRANSLATION_RATE_BURST, max_wait=TRANSLATION_RATE_MAX_WAIT
+    )
+elif TRANSLATION_RATE_LIMIT > 0:
+    translation_rate_limiter = TokenBucket(TRANSLATION_RATE_LIMIT, TRANSLATION_RATE_BURST, max_wait=TRANSLATION_RATE_MAX_WAIT)
+translation_breaker = CircuitBreaker(BREAKER_FAILURE_THRESHOLD, BREAKER_RESET_TIMEOUT)
+translation_cache = TranslationCache(
+    max_entries=TRANSLATION_CACHE_SIZE,
+    ttl=TRANSLATION_CACHE_TTL,
+    db_path=TRANSLATION_CACHE_DB or None,
+    disk_max_entries=TRANSLATION_CACHE_DISK_SIZE,
+    disk_ttl=TRANSLATION_CACHE_DISK_TTL
+)
+translation_service = TranslationService(
+    translation_backend,
+    max_workers=TRANSLATION_WORKERS,
+    max_concurrent=TRANSLATION_MAX_CONCURRENT,
+    max_queue=TRANSLATION_MAX_QUEUE,
+    cache=translation_cache,
+    batch_size=TRANSLATION_BATCH_SIZE,
+    batch_wait=TRANSLATION_BATCH_WAIT_MS / 1000,
+    rate_limiter=translation_rate_limiter,
+    breaker=translation_breaker
+)
+# Code, Links, Erwähnungen und Emojis bleiben unübersetzt, Segmente laufen parallel
+segmenter = MessageSegmenter(translation_service.translate, max_chars=TRANSLATION_SEGMENT_MAX_CHARS)
+# Gleichzeitige Anfragen für dieselbe Nachricht + Sprache zusammenführen
+translation_flights = SingleFlight()
+message_cache = MessageCache(max_entries=MESSAGE_CACHE_SIZE, max_age=MESSAGE_CACHE_MAX_AGE)
+translation_scheduler = FairScheduler(
+    concurrency=SCHEDULER_CONCURRENCY,
+    user_rate=USER_QUOTA_RATE,
+    user_burst=USER_QUOTA_BURST,
+    guild_rate=GUILD_QUOTA_RATE,
+    guild_burst=GUILD_QUOTA_BURST,
+    max_guild_queue=GUILD_MAX_QUEUE,
+    guild_weights=GUILD_WEIGHTS
+)
+outbox = Outbox(workers=OUTBOX_WORKERS, max_retries=OUTBOX_MAX_RETRIES, stage_latency=stage_latency)
+language_detector = LanguageDetector(
+    min_confidence=LANGUAGE_DETECTION_MIN_CONFIDENCE,
+    min_trigrams=LANGUAGE_DETECTION_MIN_TRIGRAMS,
+    cache_size=MESSAGE_CACHE_SIZE
+) if LANGUAGE_DETECTION else None
 
 # Mapping von Flagge -> Sprachcode
 FLAG_LANG_MAP = {
@@ -49,6 +228,11 @@ FLAG_LANG_MAP = {
     "🇹🇼": "zh-tw", "🇮🇷": "fa"
 }
 
+guild_config = GuildConfig(GUILD_CONFIG_PATH, FLAG_LANG_MAP)
+job_journal = JobJournal(flush_interval=JOURNAL_FLUSH_INTERVAL)
+# Auto-Übersetzungs-Kanäle: neue Nachrichten vorab übersetzen, nur mit freier Kapazität
+prewarmer = Prewarmer(segmenter.translate, translation_service, max_pending=PREWARM_MAX_PENDING, batch_size=PREWARM_BATCH_SIZE)
+
 # Übersetzung des Wortes "Übersetzung" in verschiedenen Sprachen
 TRANSLATION_WORD_MAP = {
     "en": "Translation", "de": "Übersetzung", "fr": "Traduction", "es": "Traducción",
@@ -75,44 +259,231 @@ ORIGINAL_WORD_MAP = {
     "zh-tw": "原文", "fa": "اصل"
 }
 
-# Lange Nachrichten splitten
-async def send_long_message(destination, text):
-    for i in range(0, len(text), 2000):
-        await destination.send(text[i:i+2000])
-
-def run_web_server():
-    """Run the Flask web monitoring interface"""
-    try:
-        app = create_web_app()
-        app.run(host='0.0.0.0', port=5000, debug=False, use_reloader=False)
-    except Exception as e:
-        print(f"❌ Fehler beim Starten des Web-Servers: {e}")
+guild_aggregates = GuildAggregates()
+memory_stats = MemoryStats(bot, profile='low' if LOW_MEMORY else 'default', interval=MEMORY_STATS_INTERVAL)
+# Worker veröffentlichen ihre Snapshots für den Launcher
+worker_stats = WorkerStatsStore(SHARED_STATE_DB) if WORKER_ID is not None else None
 
 class SimpleBotWrapper:
-    """Wrapper class to make the simple bot compatible with web monitor"""
+    """Wrapper class to make the simple bot compatible with web monitor
+
+    Stats are collected by publish_stats() and swapped in as a new snapshot
+    dict; web handlers only ever read the current snapshot.
+    """
     def __init__(self):
-        self.stats = bot_stats
+        self.status = 'Stopped'
         self.FLAG_LANG_MAP = FLAG_LANG_MAP
-        
-    def get_stats(self):
-        stats = self.stats.copy()
+        self.metrics = metrics
+        self.snapshot = self.collect_stats()
+
+    def collect_stats(self):
+        """Build a fresh stats dict (call from the event loop)"""
+        stats = {
+            'translations': translations_total.value(),
+            'errors': errors_total.total(),
+            'status': self.status,
+            'snapshot_at': time.time()
+        }
+        stats['stages'] = {stage: stage_latency.to_dict(stage=stage) for stage in REACTION_STAGES}
+        stats['translation'] = translation_service.get_stats()
+        stats['segmenter'] = segmenter.get_stats()
+        stats['interactions'] = {
+            command: {reply: interactions_total.value(command=command, reply=reply) for reply in INTERACTION_REPLIES}
+            for command in INTERACTION_COMMANDS
+        }
+        stats['guild_config'] = guild_config.get_stats()
+        stats['prewarm'] = prewarmer.get_stats()
+        stats['cache'] = translation_cache.get_stats()
+        stats['coalescing'] = translation_flights.get_stats()
+        stats['message_cache'] = message_cache.get_stats()
+        stats['scheduler'] = translation_scheduler.get_stats()
+        stats['outbox'] = outbox.get_stats()
+        stats['journal'] = job_journal.get_stats()
+        stats['web_stream'] = stats_stream.get_stats()
+        stats['history'] = stats_history.get_stats()
+        stats['memory'] = memory_stats.get_stats()
+        if language_detector is not None:
+            stats['language_detection'] = language_detector.get_stats()
         if bot.is_ready():
-            stats.update({
-                'guilds': len(bot.guilds),
-                'users': sum(guild.member_count or 0 for guild in bot.guilds),
-                'latency': round(bot.latency * 1000, 2)  # in ms
-            })
+            stats.update(guild_aggregates.get_stats())
+            stats['latency'] = round(bot.latency * 1000, 2)  # in ms
+        if isinstance(bot, discord.AutoShardedClient):
+            stats['worker'] = WORKER_ID
+            guilds_by_shard = guild_aggregates.guilds_by_shard()
+            stats['shards'] = {
+                str(shard_id): {
+                    'latency': round(latency * 1000, 2),
+                    'guilds': guilds_by_shard.get(shard_id, 0),
+                    'translations': shard_translations_total.value(shard=shard_id)
+                }
+                for shard_id, latency in bot.latencies
+            }
         return stats
 
+    def get_stats(self):
+        """Latest published snapshot (safe to call from any thread)"""
+        return dict(self.snapshot)
+
 # Create bot wrapper instance for web monitor
 bot_wrapper = SimpleBotWrapper()
 
+async def publish_stats(source):
+    """Refresh the stats snapshot at a fixed interval"""
+    while True:
+        try:
+            source.snapshot = source.collect_stats()
+            if worker_stats is not None:
+                # Worker: der Launcher liest den Snapshot aus der gemeinsamen Datenbank
+                await asyncio.get_running_loop().run_in_executor(None, worker_stats.publish, WORKER_ID, source.snapshot)
+            else:
+                stats_stream.publish(source.snapshot)
+                stats_history.record(source.snapshot)
+        except Exception as e:
+            print(f"⚠️ Statistiken konnten nicht gesammelt werden: {e}")
+        await asyncio.sleep(STATS_SNAPSHOT_INTERVAL)
+
+# Zustand der Komponenten zusätzlich als Prometheus-Gauges exportieren (aus dem Snapshot)
+STATS_SECTIONS = ('translation', 'interactions', 'segmenter', 'guild_config', 'prewarm', 'cache', 'coalescing', 'message_cache', 'scheduler', 'outbox', 'journal', 'language_detection', 'web_stream', 'history', 'memory')
+metrics.register_collector('translationbot_gateway', lambda: {
+    'ready': bot_wrapper.snapshot['status'] == 'Running',
+    'latency_seconds': bot_wrapper.snapshot.get('latency', 0) / 1000,
+    'guilds': bot_wrapper.snapshot.get('guilds', 0),
+    'users': bot_wrapper.snapshot.get('users', 0)
+})
+for section in STATS_SECTIONS:
+    metrics.register_collector(f'translationbot_{section}', lambda section=section: bot_wrapper.snapshot.get(section, {}))
+if translation_service.batcher is not None:
+    metrics.register(translation_service.batcher.batch_sizes)
+    metrics.register(translation_service.batcher.wait_seconds)
+
+@bot.event
+async def setup_hook():
+    # im Sharding-Modus synchronisiert nur der erste Worker
+    if APP_COMMANDS_SYNC and WORKER_ID in (None, 0):
+        try:
+            synced = await tree.sync()
+            print(f"✅ {len(synced)} App-Commands synchronisiert")
+        except discord.HTTPException as e:
+            print(f"⚠️ App-Commands konnten nicht synchronisiert werden: {e}")
+
 @bot.event
 async def on_ready():
-    bot_stats['status'] = 'Running'
+    bot_wrapper.status = 'Running'
+    guild_aggregates.reset(bot.guilds)
     print(f"✅ Bot eingeloggt als {bot.user}")
     print(f"🔗 Bot ist in {len(bot.guilds)} Servern aktiv")
     print("🎯 Bereit für Übersetzungen!")
+    # on_ready kommt nach jedem neuen Gateway-Login, nachgeholt wird nur einmal
+    asyncio.ensure_future(replay_jobs())
+
+# Server-/Nutzerzahlen inkrementell pflegen
+@bot.event
+async def on_guild_join(guild):
+    guild_aggregates.set_guild(guild)
+
+@bot.event
+async def on_guild_update(before, after):
+    guild_aggregates.set_guild(after)
+
+@bot.event
+async def on_guild_remove(guild):
+    guild_aggregates.remove_guild(guild.id)
+
+@bot.event
+async def on_member_join(member):
+    guild_aggregates.adjust_members(member.guild.id, 1)
+
+@bot.event
+async def on_member_remove(member):
+    guild_aggregates.adjust_members(member.guild.id, -1)
+
+# Nachrichteninhalte aus dem Gateway merken, Bearbeitungen/Löschungen invalidieren
+@bot.event
+async def on_message(message):
+    if message.guild is not None and message.content:
+        message_cache.add(message.id, message.content)
+        prewarm(message.guild.id, message.channel.id, message.id, message.content)
+
+def prewarm(guild_id, channel_id, message_id, content):
+    """Queue pre-translation if the channel is configured for it"""
+    languages = guild_config.auto_languages(guild_id, channel_id)
+    if not languages:
+        return
+    source_lang = language_detector.detect_message(message_id, content) if language_detector is not None else None
+    prewarmer.submit(message_id, content, [lang for lang in languages if lang != source_lang])
+
+@bot.event
+async def on_raw_message_edit(payload):
+    if language_detector is not None:
+        language_detector.forget(payload.message_id)
+    prewarmer.discard(payload.message_id)
+    content = payload.data.get('content')
+    if content is None:
+        message_cache.invalidate(payload.message_id)
+    else:
+        message_cache.update(payload.message_id, content)
+        if payload.guild_id is not None and content:
+            prewarm(payload.guild_id, payload.channel_id, payload.message_id, content)
+
+@bot.event
+async def on_raw_message_delete(payload):
+    message_cache.invalidate(payload.message_id)
+    prewarmer.discard(payload.message_id)
+    if language_detector is not None:
+        language_detector.forget(payload.message_id)
+
+@bot.event
+async def on_raw_bulk_message_delete(payload):
+    message_cache.invalidate_many(payload.message_ids)
+    prewarmer.discard(*payload.message_ids)
+    if language_detector is not None:
+        for message_id in payload.message_ids:
+            language_detector.forget(message_id)
+
+async def fetch_and_translate(channel, message_id, lang_code):
+    """Fetch a message and translate it, shared by all reactions on the same message + language"""
+    original_text = message_cache.get(message_id)
+    if original_text is not None and hasattr(channel, 'get_partial_message'):
+        # Partial message is enough for remove_reaction, no REST call needed
+        message = channel.get_partial_message(message_id)
+    else:
+        with stage_latency.time(stage='fetch_message'):
+            message = await channel.fetch_message(message_id)
+        original_text = message.content
+        message_cache.add(message.id, original_text)
+    translated, source_lang = await translate_content(message_id, original_text, lang_code)
+    return message, original_text, translated, source_lang
+
+async def translate_content(message_id, text, lang_code):
+    """Translate text, returns (translated, source_lang); translated is None if there is no text
+
+    message_id may be None for free text (no detection cache entry).
+    """
+    if not text.strip():
+        return None, None
+
+    source_lang = None
+    if language_detector is not None:
+        if message_id is not None:
+            source_lang = language_detector.detect_message(message_id, text)
+        else:
+            source_lang = language_detector.detect(text)
+        if source_lang == lang_code:
+            # Schon in der Zielsprache: kein Upstream-Aufruf nötig
+            language_detector.upstream_saved += 1
+            return text, source_lang
+
+    with stage_latency.time(stage='translate'):
+        translated = await segmenter.translate(text, lang_code)
+    return translated, source_lang
+
+def format_translation(lang_code, emoji, original_text, translated):
+    """Title and body of a translation reply, in the target language"""
+    translation_word = TRANSLATION_WORD_MAP.get(lang_code, "Übersetzung")
+    original_word = ORIGINAL_WORD_MAP.get(lang_code, "Original")
+    title = f"🌐 **{translation_word}** {emoji}".rstrip()
+    body = f"**{original_word}:** {original_text}\n**{lang_code.upper()}:** {translated}"
+    return title, body
 
 # Reaktion-Event für alte & neue Nachrichten
 @bot.event
@@ -121,82 +492,305 @@ async def on_raw_reaction_add(payload):
         return
 
     emoji = str(payload.emoji)
-    if emoji not in FLAG_LANG_MAP:
+    flag_map = guild_config.flag_map(payload.guild_id)
+    if emoji not in flag_map:
+        return
+
+    lang_code = flag_map[emoji]
+    reactions_total.inc()
+    # Im Journal festhalten, damit ein Neustart die Übersetzung nicht verliert;
+    # dieselbe Reaktion noch in Arbeit (z.B. entfernt und neu gesetzt): nur einmal zustellen
+    job_id = job_journal.start(
+        (payload.message_id, lang_code, payload.user_id),
+        {'guild_id': payload.guild_id, 'channel_id': payload.channel_id, 'message_id': payload.message_id,
+         'user_id': payload.user_id, 'emoji': emoji, 'lang_code': lang_code}
+    )
+    if job_id is None:
         return
+    await handle_reaction(job_id, payload.guild_id, payload.channel_id, payload.message_id, payload.member, emoji, lang_code)
+
+async def handle_reaction(job_id, guild_id, channel_id, message_id, member, emoji, lang_code):
+    """Translate a reacted message for member and queue the DM; the journal job ends once that settles"""
+    def settled(outcome):
+        return functools.partial(job_journal.complete, job_id, outcome)
 
-    lang_code = FLAG_LANG_MAP[emoji]
     try:
-        channel = bot.get_channel(payload.channel_id)
+        with stage_latency.time(stage='channel_lookup'):
+            channel = bot.get_channel(channel_id)
         if not channel:
             print("⚠️ Konnte Channel nicht finden")
+            job_journal.complete(job_id, 'skipped')
             return
 
         # Check if channel is a text channel before fetching message
         if not hasattr(channel, 'fetch_message'):
             print("⚠️ Channel unterstützt keine Nachrichten")
+            job_journal.complete(job_id, 'skipped')
             return
             
-        message = await channel.fetch_message(payload.message_id)
-        original_text = message.content
+        # Kontingent wird pro Reaktion belastet, die eigentliche Arbeit nur einmal pro Nachricht + Sprache eingeplant
+        translation_scheduler.check_user(member.id)
+        message, original_text, translated, source_lang = await translation_flights.run(
+            (message_id, lang_code),
+            lambda: translation_scheduler.submit(
+                guild_id,
+                lambda: fetch_and_translate(channel, message_id, lang_code)
+            )
+        )
 
-        if not original_text.strip():
-            await payload.member.send("❌ Die Nachricht enthält keinen Text zum Übersetzen.")
+        if translated is None:
+            outbox.send_text(member, "❌ Die Nachricht enthält keinen Text zum Übersetzen.", on_done=settled('sent'))
             return
 
-        translated = translator.translate(original_text, dest=lang_code)
-        translation_word = TRANSLATION_WORD_MAP.get(lang_code, "Übersetzung")
-        original_word = ORIGINAL_WORD_MAP.get(lang_code, "Original")
-        response = f"🌐 **{translation_word}** {emoji}\n**{original_word}:** {original_text}\n**{lang_code.upper()}:** {translated.text}"
-        
-        await send_long_message(payload.member, response)
-        bot_stats['translations'] += 1
-        print(f"✅ Übersetzung gesendet: {lang_code} für {payload.member}")
-        
-        # Reaktion entfernen nach erfolgreicher Übersetzung
-        try:
-            await message.remove_reaction(emoji, payload.member)
-        except Exception as remove_err:
-            print(f"⚠️ Konnte Reaktion nicht entfernen: {remove_err}")
+        if source_lang == lang_code:
+            notice = f"ℹ️ Die Nachricht ist bereits auf {lang_code.upper()} {emoji} – keine Übersetzung nötig."
+            outbox.send(member, [{'content': notice}], reaction=(message, emoji, member), on_done=settled('sent'))
+            return
+
+        title, body = format_translation(lang_code, emoji, original_text, translated)
+
+        # Senden und Reaktion entfernen (nach erfolgreicher Zustellung) laufen im Hintergrund
+        outbox.send(member, build_payloads(title, body), reaction=(message, emoji, member), on_done=settled('sent'))
+        translations_total.inc()
+        shard_translations_total.inc(shard=shard_of(guild_id or 0, bot.shard_count))
+        print(f"✅ Übersetzung eingereiht: {lang_code} für {member}")
+
+    except TranslationUnavailable as err:
+        # Upstream überlastet: keine Fehler-DM an jeden Nutzer, Reaktion bleibt für einen neuen Versuch stehen
+        errors_total.inc(reason='unavailable')
+        job_journal.complete(job_id, 'unavailable')
+        print(f"⏸️ Übersetzung übersprungen: {err}")
 
     except Exception as err:
-        bot_stats['errors'] += 1
-        await payload.member.send(f"⚠️ Fehler beim Übersetzen: {err}")
+        errors_total.inc(reason='error')
+        outbox.send_text(member, f"⚠️ Fehler beim Übersetzen: {err}", on_done=settled('failed'))
         print(f"❌ Übersetzungsfehler: {err}")
 
-def main():
-    """Main entry point - starts both web server and Discord bot"""
-    print("🚀 Starting Discord Translation Bot...")
+async def replay_jobs():
+    """Finish the reactions the previous run had accepted but not delivered"""
+    jobs = job_journal.take_replay()
+    if not jobs:
+        return
+    print(f"♻️ Hole {len(jobs)} unterbrochene Übersetzungen nach")
+    # begrenzt, damit das Nachholen die neuen Reaktionen nicht verdrängt
+    semaphore = asyncio.Semaphore(JOURNAL_REPLAY_CONCURRENCY)
+
+    async def replay(job_id, job):
+        async with semaphore:
+            guild = bot.get_guild(job['guild_id'])
+            member = guild.get_member(job['user_id']) if guild is not None else None
+            if member is None and guild is not None:
+                try:
+                    member = await guild.fetch_member(job['user_id'])
+                except discord.HTTPException:
+                    pass
+            if member is None:
+                job_journal.complete(job_id, 'skipped')
+                return
+            reactions_replayed_total.inc()
+            await handle_reaction(job_id, job['guild_id'], job['channel_id'], job['message_id'], member, job['emoji'], job['lang_code'])
+
+    await asyncio.gather(*(replay(job_id, job) for job_id, job in jobs))
+
+def locale_language(locale):
+    """Language code for a Discord locale (de, en-US, pt-BR, zh-TW, ...), English if unsupported"""
+    code = str(locale).lower()
+    if code in TRANSLATION_WORD_MAP:
+        return code
+    base = code.split('-')[0]
+    return base if base in TRANSLATION_WORD_MAP else 'en'
+
+async def interaction_translation(interaction, lang_code, text, message=None):
+    """Translate for an app command and return the reply payloads (never raises)"""
+    guild_id = interaction.guild_id or 0
+    flag_map = guild_config.flag_map(interaction.guild_id)
+    emoji = next((flag for flag, lang in flag_map.items() if lang == lang_code), '')
+    try:
+        translation_scheduler.check_user(interaction.user.id)
+        if message is not None:
+            async def job():
+                translated, source_lang = await translate_content(message.id, text, lang_code)
+                return message, text, translated, source_lang
+            # gleiche Nachricht + Sprache wie eine laufende Reaktion: Ergebnis teilen
+            _, _, translated, source_lang = await translation_flights.run(
+                (message.id, lang_code), lambda: translation_scheduler.submit(guild_id, job)
+            )
+        else:
+            translated, source_lang = await translation_scheduler.submit(
+                guild_id, lambda: translate_content(None, text, lang_code)
+            )
+    except QuotaExceeded:
+        return [{'content': "⏳ Du hast dein Übersetzungs-Kontingent erreicht, bitte versuche es gleich noch einmal."}]
+    except TranslationUnavailable as err:
+        errors_total.inc(reason='unavailable')
+        print(f"⏸️ Übersetzung übersprungen: {err}")
+        return [{'content': "⏸️ Der Übersetzungsdienst ist gerade ausgelastet, bitte versuche es gleich noch einmal."}]
+    except Exception as err:
+        errors_total.inc(reason='error')
+        print(f"❌ Übersetzungsfehler: {err}")
+        return [{'content': f"⚠️ Fehler beim Übersetzen: {err}"}]
+
+    if translated is None:
+        return [{'content': "❌ Die Nachricht enthält keinen Text zum Übersetzen."}]
+    if source_lang == lang_code:
+        return [{'content': f"ℹ️ Der Text ist bereits auf {lang_code.upper()} {emoji} – keine Übersetzung nötig."}]
+    translations_total.inc()
+    shard_translations_total.inc(shard=shard_of(guild_id, bot.shard_count))
+    return build_payloads(*format_translation(lang_code, emoji, text, translated))
+
+async def reply_ephemeral(interaction, command, work):
+    """Answer with the payloads produced by work, directly if it is fast enough, otherwise defer first
+
+    The fast path is a single REST call; the slow path acknowledges the
+    interaction before Discord's 3 second deadline and sends a followup.
+    """
+    start = time.perf_counter()
+    task = asyncio.ensure_future(work)
+    reply = 'immediate'
+    try:
+        try:
+            payloads = await asyncio.wait_for(asyncio.shield(task), APP_COMMAND_FAST_REPLY)
+        except asyncio.TimeoutError:
+            reply = 'deferred'
+            await interaction.response.defer(ephemeral=True, thinking=True)
+            payloads = await task
+
+        first, rest = payloads[0], payloads[1:]
+        if reply == 'deferred':
+            await interaction.followup.send(ephemeral=True, **first)
+        else:
+            await interaction.response.send_message(ephemeral=True, **first)
+        for payload in rest:
+            await interaction.followup.send(ephemeral=True, **payload)
+    except discord.HTTPException as err:
+        reply = 'failed'
+        errors_total.inc(reason='interaction')
+        print(f"❌ Antwort auf App-Command fehlgeschlagen: {err}")
+    finally:
+        interactions_total.inc(command=command, reply=reply)
+        stage_latency.observe(time.perf_counter() - start, stage='interaction_reply')
+
+@tree.context_menu(name="Translate message")
+async def translate_message_menu(interaction: discord.Interaction, message: discord.Message):
+    # Die Nachricht kommt mit der Interaktion: kein fetch_message, keine DM, keine Reaktion
+    if message.guild is not None and message.content:
+        message_cache.add(message.id, message.content)
+    lang_code = locale_language(interaction.locale)
+    await reply_ephemeral(interaction, 'translate_message', interaction_translation(interaction, lang_code, message.content, message))
+
+@tree.command(name="translate", description="Text übersetzen, die Antwort siehst nur du")
+@app_commands.describe(text="Zu übersetzender Text", language="Zielsprache (Standard: deine Discord-Sprache)")
+async def translate_command(interaction: discord.Interaction, text: str, language: str = None):
+    lang_code = language.lower() if language else locale_language(interaction.locale)
+    if lang_code not in TRANSLATION_WORD_MAP:
+        await interaction.response.send_message(f"❌ Unbekannte Sprache: {language}", ephemeral=True)
+        return
+    await reply_ephemeral(interaction, 'translate', interaction_translation(interaction, lang_code, text))
+
+@translate_command.autocomplete('language')
+async def language_autocomplete(interaction: discord.Interaction, current: str):
+    current = current.lower()
+    return [
+        app_commands.Choice(name=f"{code} – {word}", value=code)
+        for code, word in TRANSLATION_WORD_MAP.items()
+        if code.startswith(current) or current in word.lower()
+    ][:25]
+
+async def run_launcher():
+    """Start the shard workers and serve their merged stats on the web monitor"""
+    launcher = ShardLauncher(os.path.abspath(__file__), SHARD_WORKERS, SHARD_COUNT, SHARED_STATE_DB)
+    store = WorkerStatsStore(SHARED_STATE_DB)
+    store.clear()  # rows of a previous run
+    sharded_stats = ShardedStats(store, launcher, FLAG_LANG_MAP, STATS_SECTIONS, max_age=max(30, STATS_SNAPSHOT_INTERVAL * 5))
+    set_bot_instance(sharded_stats)
+    stats_history.open(STATS_HISTORY_PATH, STATS_HISTORY_SAVE_INTERVAL)
     
+    web_runner = await start_web_server('0.0.0.0', 5000)
+    print(f"✅ Web-Monitor gestartet auf http://0.0.0.0:5000 ({SHARD_COUNT} Shards in {len(launcher.ranges)} Prozessen)")
+    stats_task = asyncio.create_task(publish_stats(sharded_stats))
+    run_task = asyncio.ensure_future(launcher.run())
+    terminated = False
+
+    def terminate():
+        nonlocal terminated
+        terminated = True
+        run_task.cancel()
+
+    # SIGTERM (z.B. docker stop) beendet den Launcher über den finally-Block, sonst bleiben die Worker verwaist
+    try:
+        asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, terminate)
+    except NotImplementedError:
+        pass  # Windows
+    
+    try:
+        await run_task
+    except asyncio.CancelledError:
+        if not terminated:
+            raise
+        print("🛑 SIGTERM erhalten, beende Worker...")
+    finally:
+        stats_task.cancel()
+        await launcher.stop()
+        stats_history.save()
+        store.close()
+        await web_runner.cleanup()
+
+async def run_bot():
+    """Run web monitor and Discord bot together on one event loop"""
     # Set bot instance for web monitor
     set_bot_instance(bot_wrapper)
-    
-    # Start web server in a separate thread
-    web_thread = threading.Thread(target=run_web_server, daemon=True)
-    web_thread.start()
-    print("✅ Web-Monitor gestartet auf http://0.0.0.0:5000")
-    
-    # Small delay to let web server start
-    time.sleep(2)
-    
-    # Start Discord bot
-    if TOKEN:
+    web_runner = None
+    if worker_stats is None:
+        stats_history.open(STATS_HISTORY_PATH, STATS_HISTORY_SAVE_INTERVAL)
+        web_runner = await start_web_server('0.0.0.0', 5000)
+        print("✅ Web-Monitor gestartet auf http://0.0.0.0:5000")
+    else:
+        print(f"🧩 Worker {WORKER_ID}: Shards {SHARD_IDS} von {SHARD_COUNT}")
+        # Launcher beendet Worker mit SIGTERM: Gateway sauber schließen
         try:
+            asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, lambda: asyncio.ensure_future(bot.close()))
+        except NotImplementedError:
+            pass  # Windows
+    if JOURNAL_PATH:
+        # jeder Worker hat feste Shards und damit sein eigenes Journal
+        root, ext = os.path.splitext(JOURNAL_PATH)
+        job_journal.open(JOURNAL_PATH if WORKER_ID is None else f"{root}.worker{WORKER_ID}{ext}", JOURNAL_REPLAY_MAX_AGE)
+    stats_task = asyncio.create_task(publish_stats(bot_wrapper))
+    
+    try:
+        # Start Discord bot
+        if TOKEN:
             print("🔐 Discord Token gefunden")
             print("🌐 Unterstützte Sprachen:", len(FLAG_LANG_MAP))
-            bot.run(TOKEN)
-        except KeyboardInterrupt:
-            print("\n🛑 Bot wurde gestoppt.")
-        except Exception as e:
-            print(f"❌ Kritischer Fehler: {e}")
-    else:
-        print("❌ Kann Bot nicht starten - kein Discord Token verfügbar")
-        print("🌐 Web-Monitor läuft weiter auf http://0.0.0.0:5000")
-        # Keep web server running even without bot
-        try:
-            while True:
-                time.sleep(60)
-        except KeyboardInterrupt:
-            print("\n🛑 Anwendung gestoppt.")
+            discord.utils.setup_logging()
+            async with bot:
+                await bot.start(TOKEN)
+        else:
+            print("❌ Kann Bot nicht starten - kein Discord Token verfügbar")
+            print("🌐 Web-Monitor läuft weiter auf http://0.0.0.0:5000")
+            # Keep web server running even without bot
+            await asyncio.Event().wait()
+    finally:
+        stats_task.cancel()
+        job_journal.close()
+        if web_runner is not None:
+            stats_history.save()
+            await web_runner.cleanup()
+
+def main():
+    """Main entry point - starts both web server and Discord bot"""
+    print("🚀 Starting Discord Translation Bot...")
+    try:
+        if SHARD_WORKERS > 1 and WORKER_ID is None:
+            asyncio.run(run_launcher())
+        else:
+            asyncio.run(run_bot())
+    except KeyboardInterrupt:
+        print("\n🛑 Bot wurde gestoppt.")
+    except Exception as e:
+        print(f"❌ Kritischer Fehler: {e}")
+    finally:
+        translation_service.close()
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,62 @@
+"""
+Memory statistics for Discord Translation Bot
+Process RSS and the size of discord.py's caches, to track the memory cost per guild
+"""
+
+import sys
+import time
+
+
+def read_rss_bytes():
+    """Current resident set size of this process, None where it cannot be read"""
+    try:
+        with open('/proc/self/status', 'r') as f:
+            for line in f:
+                if line.startswith('VmRSS:'):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    # no /proc (macOS, BSD): fall back to the peak RSS
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+class MemoryStats:
+    """RSS and client cache sizes, recomputed at most every interval seconds
+
+    Counting cached members walks every guild, so the result is kept between
+    stats refreshes instead of being rebuilt every few seconds.
+    """
+    def __init__(self, client, profile='default', interval=30):
+        self.client = client
+        self.profile = profile
+        self.interval = interval
+        self._stats = None
+        self._updated = 0.0
+
+    def _collect(self):
+        client = self.client
+        guilds = client.guilds
+        rss = read_rss_bytes()
+        stats = {
+            'profile': self.profile,
+            'rss_bytes': rss or 0,
+            'cached_guilds': len(guilds),
+            'cached_members': sum(len(guild.members) for guild in guilds),
+            'cached_users': len(client.users),
+            'cached_messages': len(client.cached_messages),
+            'cached_private_channels': len(client.private_channels)
+        }
+        stats['rss_per_guild_bytes'] = round(rss / len(guilds)) if rss and guilds else 0
+        return stats
+
+    def get_stats(self):
+        now = time.monotonic()
+        if self._stats is None or now - self._updated >= self.interval:
+            self._stats = self._collect()
+            self._updated = now
+        return dict(self._stats)
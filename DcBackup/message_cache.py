@@ -0,0 +1,86 @@
+"""
+Recent message content cache for Discord Translation Bot
+Filled from gateway events so reactions rarely need a fetch_message REST call
+"""
+
+import sys
+import time
+from collections import OrderedDict
+
+
+class MessageCache:
+    """Bounded, age-limited store of message_id -> text content"""
+    def __init__(self, max_entries=10000, max_age=86400):
+        self.max_entries = max_entries
+        self.max_age = max_age
+        self._entries = OrderedDict()  # message_id -> (stored_at, content)
+        self.content_bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+        self.expirations = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def add(self, message_id, content):
+        """Remember the content of a message (newest entries are kept longest)"""
+        self._discard(message_id)
+        self._entries[message_id] = (time.monotonic(), content)
+        self.content_bytes += sys.getsizeof(content)
+        while len(self._entries) > self.max_entries:
+            _, (_, old_content) = self._entries.popitem(last=False)
+            self.content_bytes -= sys.getsizeof(old_content)
+            self.evictions += 1
+
+    def get(self, message_id):
+        """Return cached content, or None on a miss"""
+        entry = self._entries.get(message_id)
+        if entry is None:
+            self.misses += 1
+            return None
+        stored_at, content = entry
+        if stored_at < time.monotonic() - self.max_age:
+            self._discard(message_id)
+            self.expirations += 1
+            self.misses += 1
+            return None
+        self.hits += 1
+        return content
+
+    def update(self, message_id, content):
+        """Apply an edit, only for messages that are already cached"""
+        entry = self._entries.get(message_id)
+        if entry is None:
+            return
+        self.content_bytes += sys.getsizeof(content) - sys.getsizeof(entry[1])
+        self._entries[message_id] = (entry[0], content)
+
+    def invalidate(self, message_id):
+        if self._discard(message_id):
+            self.invalidations += 1
+
+    def invalidate_many(self, message_ids):
+        for message_id in message_ids:
+            self.invalidate(message_id)
+
+    def _discard(self, message_id):
+        entry = self._entries.pop(message_id, None)
+        if entry is None:
+            return False
+        self.content_bytes -= sys.getsizeof(entry[1])
+        return True
+
+    def get_stats(self):
+        lookups = self.hits + self.misses
+        return {
+            'entries': len(self._entries),
+            'max_entries': self.max_entries,
+            'max_age': self.max_age,
+            'content_bytes': self.content_bytes,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / lookups, 3) if lookups else 0,
+            'expirations': self.expirations,
+            'evictions': self.evictions,
+            'invalidations': self.invalidations
+        }
@@ -0,0 +1,290 @@
+"""
+DM outbox for Discord Translation Bot
+Packs responses into few messages/embeds and delivers them in the background with per-route backoff
+"""
+
+import asyncio
+import functools
+import time
+import unicodedata
+
+import discord
+
+MESSAGE_LIMIT = 2000
+EMBED_DESCRIPTION_LIMIT = 4096
+EMBED_TOTAL_LIMIT = 6000
+EMBEDS_PER_MESSAGE = 10
+
+_FENCE = "```"
+# Preferred split points, best first
+_BOUNDARIES = ("\n\n", "\n", ". ", "! ", "? ", "。", " ")
+
+
+def _joins_previous(char):
+    """True if char must stay attached to the character before it (same grapheme)"""
+    code = ord(char)
+    return (
+        unicodedata.combining(char)
+        or char in ("\u200d", "\ufe0e", "\ufe0f")
+        or 0x1F3FB <= code <= 0x1F3FF      # skin tone modifiers
+        or 0xE0020 <= code <= 0xE007F      # tag sequences (subdivision flags)
+    )
+
+
+def _safe_cut(text, pos):
+    """Move pos left until it does not split a grapheme cluster or a flag pair"""
+    while 0 < pos < len(text):
+        if _joins_previous(text[pos]) or text[pos - 1] == "\u200d":
+            pos -= 1
+            continue
+        # regional indicators pair up; never cut between the two halves of a flag
+        if 0x1F1E6 <= ord(text[pos]) <= 0x1F1FF:
+            run = 0
+            while pos - run - 1 >= 0 and 0x1F1E6 <= ord(text[pos - run - 1]) <= 0x1F1FF:
+                run += 1
+            if run % 2:
+                pos -= 1
+                continue
+        break
+    return pos
+
+
+def _open_fence(text):
+    """Return the opening fence line if text ends inside a code block, else None"""
+    fence = None
+    for line in text.split("\n"):
+        stripped = line.strip()
+        if stripped.startswith(_FENCE):
+            if fence is None:
+                fence = stripped if stripped.count(_FENCE) == 1 else None
+            elif stripped.count(_FENCE) % 2 == 1:
+                fence = None
+    return fence
+
+
+def split_message(text, limit=MESSAGE_LIMIT):
+    """Split text into chunks of at most limit characters on safe boundaries
+
+    Prefers paragraph, line, sentence and word boundaries, never cuts through
+    an emoji sequence and closes/reopens code blocks that span two chunks.
+    """
+    chunks = []
+    reopen = ""
+    while text:
+        text = reopen + text
+        if len(text) <= limit:
+            chunks.append(text)
+            break
+
+        budget = limit - len(_FENCE) - 1  # room to close a code block
+        window = text[:budget]
+        cut = -1
+        for boundary in _BOUNDARIES:
+            index = window.rfind(boundary)
+            # ignore boundaries that would leave a tiny first chunk
+            if index >= budget // 4:
+                cut = index + len(boundary)
+                break
+        if cut <= len(reopen):
+            cut = _safe_cut(text, budget)
+        if cut <= len(reopen):
+            cut = budget  # a single cluster longer than the limit, nothing left to protect
+
+        chunk, text = text[:cut], text[cut:]
+        fence = _open_fence(chunk)
+        if fence is not None:
+            chunk = chunk.rstrip("\n") + "\n" + _FENCE
+            # the next chunk must still make progress: a fence line too long to repeat
+            # is reopened without its info string, and not at all if even that does not fit
+            reopen = fence + "\n"
+            if len(reopen) > budget // 2:
+                reopen = _FENCE + "\n" if len(_FENCE) + 1 <= budget // 2 else ""
+        else:
+            reopen = ""
+        chunks.append(chunk.rstrip() or chunk)
+        text = text.lstrip("\n") if not reopen else text
+    return chunks
+
+
+def build_payloads(title, body, color=None):
+    """Pack a titled response into as few send() kwargs as possible
+
+    Short responses stay a single plain message; longer ones become embeds
+    (4096 characters each, up to 10 embeds / 6000 characters per message).
+    """
+    plain = f"{title}\n{body}"
+    if len(plain) <= MESSAGE_LIMIT:
+        return [{'content': plain}]
+
+    color = color if color is not None else discord.Color.blurple()
+    payloads = []
+    embeds = []
+    total = 0
+    for index, part in enumerate(split_message(body, EMBED_DESCRIPTION_LIMIT)):
+        embed = discord.Embed(description=part, color=color)
+        size = len(part)
+        if index == 0:
+            embed.title = title.replace("**", "")[:256]
+            size += len(embed.title)
+        if embeds and (len(embeds) >= EMBEDS_PER_MESSAGE or total + size > EMBED_TOTAL_LIMIT):
+            payloads.append({'embeds': embeds})
+            embeds, total = [], 0
+        embeds.append(embed)
+        total += size
+    if embeds:
+        payloads.append({'embeds': embeds})
+    return payloads
+
+
+class _Delivery:
+    __slots__ = ('kind', 'route', 'steps', 'done', 'attempts', 'on_success', 'on_done')
+
+    def __init__(self, kind, route, steps, on_success=None, on_done=None):
+        self.kind = kind
+        self.route = route
+        self.steps = steps            # coroutine functions, one REST call each
+        self.done = 0                 # steps already completed (kept across retries)
+        self.attempts = 0
+        self.on_success = on_success
+        self.on_done = on_done        # called once the delivery ends, whatever the outcome
+
+
+class Outbox:
+    """Background sender for DMs and reaction removals
+
+    The payloads of one delivery are sent in order; a 429 or 5xx blocks only
+    that route and retries with backoff from the step that failed.
+    """
+    STAGES = {'dm': 'dm_send', 'reaction': 'reaction_remove'}
+
+    def __init__(self, workers=4, max_retries=3, base_backoff=1.0, stage_latency=None):
+        self.workers = workers
+        self.stage_latency = stage_latency  # optional Histogram with a 'stage' label
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self._queue = None
+        self._tasks = []
+        self._blocked_until = {}  # route -> loop time
+        self._delayed = 0         # deliveries waiting for their route outside the queue
+
+        self.messages_sent = 0
+        self.deliveries = 0
+        self.reactions_removed = 0
+        self.retries = 0
+        self.rate_limited = 0
+        self.forbidden = 0
+        self.failed = 0
+
+    def _put(self, delivery):
+        if self._queue is None:
+            self._queue = asyncio.Queue()
+        self._tasks = [task for task in self._tasks if not task.done()]
+        while len(self._tasks) < self.workers:
+            self._tasks.append(asyncio.ensure_future(self._worker()))
+        self._queue.put_nowait(delivery)
+
+    def send(self, destination, payloads, reaction=None, on_done=None):
+        """Queue payloads (send() kwargs) for destination, then remove reaction=(message, emoji, member)"""
+        steps = [functools.partial(destination.send, **payload) for payload in payloads]
+        on_success = None
+        if reaction is not None:
+            on_success = functools.partial(self.remove_reaction, *reaction)
+        self._put(_Delivery('dm', ('dm', destination.id), steps, on_success, on_done))
+
+    def send_text(self, destination, text, on_done=None):
+        """Queue a plain text message, split on safe boundaries if needed"""
+        self.send(destination, [{'content': chunk} for chunk in split_message(text)], on_done=on_done)
+
+    def remove_reaction(self, message, emoji, member):
+        step = functools.partial(message.remove_reaction, emoji, member)
+        self._put(_Delivery('reaction', ('reaction', message.channel.id), [step]))
+
+    def _put_later(self, delivery, delay, loop):
+        self._delayed += 1
+        loop.call_later(delay, self._put_delayed, delivery)
+
+    def _put_delayed(self, delivery):
+        self._delayed -= 1
+        self._queue.put_nowait(delivery)
+
+    async def _worker(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            delivery = await self._queue.get()
+            try:
+                blocked_until = self._blocked_until.get(delivery.route)
+                if blocked_until is not None:
+                    if blocked_until > loop.time():
+                        # park it instead of sleeping, the worker serves other routes meanwhile
+                        self._put_later(delivery, blocked_until - loop.time(), loop)
+                        continue
+                    del self._blocked_until[delivery.route]
+                await self._attempt(delivery, loop)
+            except Exception as e:
+                self.failed += 1
+                print(f"❌ Outbox-Fehler: {e}")
+                self._finished(delivery)
+            finally:
+                self._queue.task_done()
+
+    async def _attempt(self, delivery, loop):
+        delivery.attempts += 1
+        try:
+            while delivery.done < len(delivery.steps):
+                start = time.perf_counter()
+                await delivery.steps[delivery.done]()
+                if self.stage_latency is not None:
+                    self.stage_latency.observe(time.perf_counter() - start, stage=self.STAGES[delivery.kind])
+                delivery.done += 1
+                if delivery.kind == 'dm':
+                    self.messages_sent += 1
+        except discord.Forbidden as e:
+            self.forbidden += 1
+            print(f"⚠️ Zustellung nicht erlaubt ({delivery.kind}): {e}")
+            self._finished(delivery)
+            return
+        except (discord.RateLimited, discord.HTTPException) as e:
+            status = 429 if isinstance(e, discord.RateLimited) else e.status
+            if (status == 429 or status >= 500) and delivery.attempts <= self.max_retries:
+                delay = getattr(e, 'retry_after', None) or self.base_backoff * 2 ** (delivery.attempts - 1)
+                if status == 429:
+                    self.rate_limited += 1
+                self.retries += 1
+                self._blocked_until[delivery.route] = loop.time() + delay
+                self._put_later(delivery, delay, loop)
+                return
+            self.failed += 1
+            print(f"❌ Zustellung fehlgeschlagen ({delivery.kind}): {e}")
+            self._finished(delivery)
+            return
+
+        self._blocked_until.pop(delivery.route, None)
+        if delivery.kind == 'dm':
+            self.deliveries += 1
+        else:
+            self.reactions_removed += 1
+        if delivery.on_success is not None:
+            delivery.on_success()
+        self._finished(delivery)
+
+    def _finished(self, delivery):
+        if delivery.on_done is not None:
+            on_done, delivery.on_done = delivery.on_done, None
+            on_done()
+
+    def get_stats(self):
+        now = time.monotonic()  # the clock of asyncio's loop.time()
+        self._blocked_until = {route: until for route, until in self._blocked_until.items() if until > now}
+        return {
+            'queued': self._queue.qsize() if self._queue is not None else 0,
+            'delayed': self._delayed,
+            'workers': self.workers,
+            'deliveries': self.deliveries,
+            'messages_sent': self.messages_sent,
+            'reactions_removed': self.reactions_removed,
+            'retries': self.retries,
+            'rate_limited': self.rate_limited,
+            'forbidden': self.forbidden,
+            'failed': self.failed,
+            'blocked_routes': len(self._blocked_until)
+        }
@@ -0,0 +1,109 @@
+"""
+Background pre-translation for Discord Translation Bot
+Warms the translation cache for messages in auto-translate channels using only spare capacity
+"""
+
+import asyncio
+import time
+from collections import deque
+
+
+class Prewarmer:
+    """Translates queued messages in small batches whenever the translation service is idle
+
+    Reactions always go first: a batch only starts while the service has no
+    queued work, free concurrency and (if rate limited) a token to spare, and
+    it is no larger than the free concurrency and the tokens available then.
+    The queue is bounded and drops the oldest messages when it overflows.
+    """
+    def __init__(self, translate, service, max_pending=500, batch_size=20, idle_poll=0.5):
+        self.translate = translate  # coroutine function (text, dest), e.g. MessageSegmenter.translate
+        self.service = service
+        self.batch_size = batch_size
+        self.idle_poll = idle_poll
+        self._pending = deque(maxlen=max_pending)  # (message_id, text, dest)
+        self._wakeup = None
+        self._task = None
+
+        self.submitted = 0
+        self.translated = 0
+        self.failed = 0
+        self.dropped = 0
+        self.deferred = 0
+        self.batches = 0
+
+    def submit(self, message_id, text, languages):
+        """Queue text for each language (call from the event loop)"""
+        if self._task is None or self._task.done():
+            self._wakeup = asyncio.Event()
+            self._task = asyncio.ensure_future(self._run())
+        for dest in languages:
+            if len(self._pending) == self._pending.maxlen:
+                self.dropped += 1
+            self._pending.append((message_id, text, dest))
+            self.submitted += 1
+        self._wakeup.set()
+
+    def discard(self, *message_ids):
+        """Forget queued work of edited or deleted messages"""
+        message_ids = set(message_ids)
+        if any(job[0] in message_ids for job in self._pending):
+            kept = [job for job in self._pending if job[0] not in message_ids]
+            self._pending.clear()
+            self._pending.extend(kept)
+
+    def _busy(self):
+        service = self.service
+        if service.queued or service.in_flight >= service.max_concurrent:
+            return True
+        if service.batcher is not None and service.batcher.pending:
+            return True
+        breaker = service.breaker
+        if breaker is not None:
+            if breaker.state == breaker.HALF_OPEN:
+                return True  # a probe is running
+            if breaker.state == breaker.OPEN and time.monotonic() - breaker.opened_at < breaker.reset_timeout:
+                return True
+        # estimated_wait: a shared (SQLite) bucket must not be queried on the event loop
+        return service.rate_limiter is not None and service.rate_limiter.estimated_wait(1) > 0
+
+    def _capacity(self):
+        """How many items may start now without making a reaction wait for a slot or a token"""
+        service = self.service
+        size = min(self.batch_size, len(self._pending), service.max_concurrent - service.in_flight)
+        if service.rate_limiter is not None:
+            while size > 1 and service.rate_limiter.estimated_wait(size) > 0:
+                size -= 1
+        return size
+
+    async def _run(self):
+        while True:
+            if not self._pending:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+            if self._busy():
+                self.deferred += 1
+                await asyncio.sleep(self.idle_poll)
+                continue
+
+            batch = [self._pending.popleft() for _ in range(self._capacity())]
+            self.batches += 1
+            # submitted together so the service's batcher merges them into few upstream calls
+            results = await asyncio.gather(*(self.translate(text, dest) for _, text, dest in batch), return_exceptions=True)
+            for result in results:
+                if isinstance(result, Exception):
+                    self.failed += 1
+                else:
+                    self.translated += 1
+
+    def get_stats(self):
+        return {
+            'pending': len(self._pending),
+            'submitted': self.submitted,
+            'translated': self.translated,
+            'failed': self.failed,
+            'dropped': self.dropped,
+            'deferred': self.deferred,
+            'batches': self.batches
+        }
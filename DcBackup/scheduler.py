@@ -0,0 +1,191 @@
+"""
+Fair scheduling for Discord Translation Bot
+Per-user and per-guild quotas plus weighted fair queuing of translation work across guilds
+"""
+
+import asyncio
+from collections import deque
+
+from translation_backends import TokenBucket, TranslationUnavailable
+
+
+class QuotaExceeded(TranslationUnavailable):
+    """Raised when a user or guild is over its translation quota"""
+
+
+class _GuildQueue:
+    __slots__ = ('weight', 'bucket', 'jobs', 'last_finish', 'dispatched', 'wait_total', 'wait_max', 'dropped')
+
+    def __init__(self, weight, bucket):
+        self.weight = weight
+        self.bucket = bucket
+        self.jobs = deque()  # (finish_tag, job, future, enqueued_at)
+        self.last_finish = 0.0
+        self.dispatched = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self.dropped = 0
+
+
+class FairScheduler:
+    """Runs jobs with bounded concurrency, sharing slots fairly between guilds
+
+    Users over their token bucket are dropped. Guilds over theirs stay queued
+    (deferred) until the bucket refills. Among eligible guilds the job with the
+    smallest virtual finish tag runs next (self-clocked weighted fair queuing).
+    """
+    def __init__(self, concurrency=8, user_rate=0.2, user_burst=5, guild_rate=2.0, guild_burst=20,
+                 max_guild_queue=50, guild_weights=None):
+        self.concurrency = concurrency
+        self.user_rate = user_rate
+        self.user_burst = user_burst
+        self.guild_rate = guild_rate
+        self.guild_burst = guild_burst
+        self.max_guild_queue = max_guild_queue
+        self.guild_weights = guild_weights or {}
+
+        self._users = {}   # user_id -> TokenBucket
+        self._guilds = {}  # guild_id -> _GuildQueue
+        self._virtual_time = 0.0
+        self._running = 0
+        self._wakeup = None
+        self._dispatcher = None
+        self._admitted_since_prune = 0
+
+        self.admitted = 0
+        self.dropped_user = 0
+        self.dropped_guild = 0
+        self.deferred = 0
+
+    def check_user(self, user_id):
+        """Charge one request to the user's quota, raises QuotaExceeded when it is used up"""
+        bucket = self._users.get(user_id)
+        if bucket is None:
+            bucket = self._users[user_id] = TokenBucket(self.user_rate, self.user_burst)
+        if not bucket.try_acquire():
+            self.dropped_user += 1
+            raise QuotaExceeded(f"Nutzer {user_id} hat sein Übersetzungs-Kontingent aufgebraucht")
+
+        self._admitted_since_prune += 1
+        if self._admitted_since_prune >= 1000:
+            self._prune()
+
+    async def submit(self, guild_id, job):
+        """Queue job (a coroutine function) for guild_id and wait for its result"""
+        queue = self._guilds.get(guild_id)
+        if queue is None:
+            weight = self.guild_weights.get(guild_id, 1.0)
+            queue = self._guilds[guild_id] = _GuildQueue(weight, TokenBucket(self.guild_rate, self.guild_burst))
+        if len(queue.jobs) >= self.max_guild_queue:
+            queue.dropped += 1
+            self.dropped_guild += 1
+            raise QuotaExceeded(f"Warteschlange für Server {guild_id} ist voll")
+
+        loop = asyncio.get_running_loop()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._wakeup = asyncio.Event()
+            self._dispatcher = asyncio.ensure_future(self._dispatch())
+
+        finish_tag = max(self._virtual_time, queue.last_finish) + 1.0 / queue.weight
+        queue.last_finish = finish_tag
+        future = loop.create_future()
+        queue.jobs.append((finish_tag, job, future, loop.time()))
+        self.admitted += 1
+        self._wakeup.set()
+        return await future
+
+    def _pick(self):
+        """Pop the next eligible job, or return the delay until a deferred guild refills"""
+        best = None
+        next_ready = None
+        for queue in self._guilds.values():
+            while queue.jobs and queue.jobs[0][2].done():
+                queue.jobs.popleft()  # waiter was cancelled while queued, must not use up a token
+            if not queue.jobs:
+                continue
+            delay = queue.bucket.time_until(1)
+            if delay > 0:
+                next_ready = delay if next_ready is None else min(next_ready, delay)
+                continue
+            if best is None or queue.jobs[0][0] < best.jobs[0][0]:
+                best = queue
+        if best is None:
+            return None, next_ready
+        best.bucket.try_acquire()
+        return best, None
+
+    async def _dispatch(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            if self._running >= self.concurrency:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+                continue
+
+            queue, delay = self._pick()
+            if queue is None:
+                self._wakeup.clear()
+                if delay is not None:
+                    self.deferred += 1
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), delay)
+                    except asyncio.TimeoutError:
+                        pass
+                else:
+                    await self._wakeup.wait()
+                continue
+
+            finish_tag, job, future, enqueued_at = queue.jobs.popleft()
+            self._virtual_time = finish_tag
+            waited = loop.time() - enqueued_at
+            queue.dispatched += 1
+            queue.wait_total += waited
+            queue.wait_max = max(queue.wait_max, waited)
+
+            self._running += 1
+            task = asyncio.ensure_future(job())
+            task.add_done_callback(lambda t, f=future: self._finished(t, f))
+
+    def _finished(self, task, future):
+        self._running -= 1
+        self._wakeup.set()
+        if future.done():
+            return
+        if task.cancelled():
+            future.cancel()
+        elif task.exception() is not None:
+            future.set_exception(task.exception())
+        else:
+            future.set_result(task.result())
+
+    def _prune(self):
+        """Forget idle users and guilds whose buckets have fully refilled"""
+        self._admitted_since_prune = 0
+        for user_id in [uid for uid, bucket in self._users.items() if bucket.is_full()]:
+            del self._users[user_id]
+        for guild_id in [gid for gid, q in self._guilds.items() if not q.jobs and q.bucket.is_full()]:
+            del self._guilds[guild_id]
+
+    def get_stats(self):
+        guilds = {}
+        busiest = sorted(self._guilds.items(), key=lambda item: (len(item[1].jobs), item[1].dispatched), reverse=True)
+        for guild_id, queue in busiest[:20]:
+            guilds[str(guild_id)] = {
+                'queued': len(queue.jobs),
+                'dispatched': queue.dispatched,
+                'dropped': queue.dropped,
+                'weight': queue.weight,
+                'avg_wait_ms': round(queue.wait_total / queue.dispatched * 1000, 1) if queue.dispatched else 0,
+                'max_wait_ms': round(queue.wait_max * 1000, 1)
+            }
+        return {
+            'concurrency': self.concurrency,
+            'running': self._running,
+            'queued': sum(len(q.jobs) for q in self._guilds.values()),
+            'admitted': self.admitted,
+            'dropped_user': self.dropped_user,
+            'dropped_guild': self.dropped_guild,
+            'deferred': self.deferred,
+            'tracked_users': len(self._users),
+            'guilds': guilds
+        }
@@ -0,0 +1,226 @@
+"""
+Markup-aware message segmentation for Discord Translation Bot
+Keeps code, links, mentions, emoji and Discord markdown out of the translation and splits long
+prose into sentence-aligned segments that are translated concurrently
+"""
+
+import asyncio
+import re
+
+from outbox import split_message
+
+# Block-level spans: copied verbatim and the prose around them is translated separately
+_BLOCK = re.compile(r"```.*?(?:```|\Z)", re.DOTALL)  # code block (an unclosed one runs to the end)
+
+# Inline spans: replaced by a placeholder so the sentence around them is translated as a whole
+_INLINE = re.compile(
+    r"`[^`\n]+`"                                 # inline code
+    r"|<a?:\w+:\d+>"                             # custom emoji
+    r"|<(?:@[!&]?|#)\d+>"                        # user, role and channel mentions
+    r"|</[\w -]+:\d+>"                           # slash command mentions
+    r"|<t:-?\d+(?::[tTdDfFR])?>"                 # timestamps
+    r"|<https?://[^\s>]+>"                       # links with suppressed embed
+    r"|https?://[^\s<>]*[^\s<>.,:;!?)\"']"       # links, without trailing punctuation
+    r"|@(?:everyone|here)\b"
+    r"|(?<!\w):[A-Za-z0-9_+-]{2,32}:(?!\w)"      # emoji shortcodes (not 'note:this:')
+    r"|^(?:>>> |> |#{1,3} |-# )"                 # quote, heading and subtext prefixes
+    r"|\*{1,3}|__|\|\||~~"                       # bold/italic, underline, spoiler, strikethrough
+    r"|⟦\d+⟧",                                   # text that looks like a placeholder
+    re.MULTILINE
+)
+_PLACEHOLDER = re.compile(r"⟦\s*(\d+)\s*⟧")
+_EDGE_PLACEHOLDERS = re.compile(r"\A(?:\s|⟦\d+⟧)+|(?:\s|⟦\d+⟧)+\Z")
+# Sentence ends (followed by whitespace) and line breaks
+_SENTENCE_BREAK = re.compile(r"(?<=[.!?…])\s+|(?<=[。！？])\s*|\n+")
+
+
+def _mask(text):
+    """Replace inline spans by ⟦n⟧; returns (masked text, spans)"""
+    spans = []
+
+    def hold(match):
+        spans.append(match.group())
+        return f"⟦{len(spans) - 1}⟧"
+
+    return _INLINE.sub(hold, text), spans
+
+
+def _unmask(text, spans):
+    """Put the spans back; None unless every placeholder came back exactly once"""
+    found = [int(index) for index in _PLACEHOLDER.findall(text)]
+    if sorted(found) != list(range(len(spans))):
+        return None
+    return _PLACEHOLDER.sub(lambda match: spans[int(match.group(1))], text)
+
+
+def _has_letters(masked):
+    return any(char.isalpha() for char in _PLACEHOLDER.sub(' ', masked))
+
+
+class MessageSegmenter:
+    """Translates a message as prose segments, leaving non-translatable spans untouched
+
+    translate is a coroutine function (text, dest) -> translated text, normally
+    TranslationService.translate, so segments share its cache, batching and limits.
+    Inline spans travel through the upstream as ⟦n⟧ placeholders; if the
+    upstream mangles one, that segment is translated piecewise between the spans.
+    """
+    def __init__(self, translate, max_chars=1500):
+        self.translate_segment = translate
+        self.max_chars = max_chars
+
+        self.messages = 0
+        self.split_messages = 0
+        self.segments = 0
+        self.protected_spans = 0
+        self.placeholder_fallbacks = 0
+        self.chars_total = 0
+        self.chars_sent = 0
+
+    def segment(self, text):
+        """Split text into (translate, piece) tokens; joining all pieces gives text back
+
+        Translatable pieces may still contain inline spans, translate() masks them.
+        """
+        tokens = []
+        position = 0
+        for match in _BLOCK.finditer(text):
+            self._add_prose(tokens, text[position:match.start()])
+            tokens.append((False, match.group()))
+            position = match.end()
+        self._add_prose(tokens, text[position:])
+        return tokens
+
+    def _add_prose(self, tokens, prose):
+        if not prose:
+            return
+        masked, spans = _mask(prose)
+        if not _has_letters(masked):
+            tokens.append((False, prose))  # whitespace, punctuation, numbers, markup
+            return
+
+        def restore(piece):
+            return _PLACEHOLDER.sub(lambda match: spans[int(match.group(1))], piece)
+
+        # leading/trailing whitespace and spans (mentions, quote prefixes, ...) stay out of the request
+        start = end = 0
+        for edge in _EDGE_PLACEHOLDERS.finditer(masked):
+            if edge.start() == 0:
+                start = edge.end()
+            else:
+                end = len(masked) - edge.start()
+        core = masked[start:len(masked) - end]
+        if start:
+            tokens.append((False, restore(masked[:start])))
+        tokens.extend((translate, restore(piece)) for translate, piece in self._split(core))
+        if end:
+            tokens.append((False, restore(masked[len(masked) - end:])))
+
+    def _split(self, prose):
+        """Pack whole sentences into segments of at most max_chars"""
+        if len(prose) <= self.max_chars:
+            return [(True, prose)]
+
+        sentences = []  # (sentence, separator after it)
+        position = 0
+        for match in _SENTENCE_BREAK.finditer(prose):
+            if match.start() > position:
+                sentences.append((prose[position:match.start()], match.group()))
+                position = match.end()
+            elif sentences:
+                sentences[-1] = (sentences[-1][0], sentences[-1][1] + match.group())
+                position = match.end()
+        if position < len(prose):
+            sentences.append((prose[position:], ''))
+
+        tokens = []
+        current, separator = '', ''
+        for sentence, after in sentences:
+            if current and len(current) + len(separator) + len(sentence) <= self.max_chars:
+                current += separator + sentence
+            else:
+                if current:
+                    tokens.append((True, current))
+                    tokens.append((False, separator))
+                if len(sentence) > self.max_chars:
+                    # a single sentence over the limit: split on words, keep the original gaps
+                    tokens.extend(self._split_long(sentence))
+                    current = tokens.pop()[1]
+                else:
+                    current = sentence
+            separator = after
+        tokens.append((True, current))
+        if separator:
+            tokens.append((False, separator))
+        return tokens
+
+    def _split_long(self, sentence):
+        tokens = []
+        position = 0
+        for chunk in split_message(sentence, self.max_chars):
+            start = sentence.find(chunk, position)
+            if start > position:
+                tokens.append((False, sentence[position:start]))
+            tokens.append((True, chunk))
+            position = start + len(chunk)
+        return tokens
+
+    async def _translate_piece(self, piece, dest):
+        masked, spans = _mask(piece)
+        self.protected_spans += len(spans)
+        self.chars_sent += len(masked)
+        if not spans:
+            return await self.translate_segment(piece, dest)
+        restored = _unmask(await self.translate_segment(masked, dest), spans)
+        if restored is not None:
+            return restored
+
+        # placeholder lost or duplicated upstream: translate the prose between the spans instead
+        self.placeholder_fallbacks += 1
+        parts = _INLINE.split(piece)
+        translated = await asyncio.gather(*(
+            self.translate_segment(part.strip(), dest) for part in parts if _has_letters(part)
+        ))
+        translated = iter(translated)
+        result = []
+        for index, part in enumerate(parts):
+            if _has_letters(part):
+                core = part.strip()
+                lead = part[:part.index(core)]
+                result.append(lead + next(translated) + part[len(lead) + len(core):])
+            else:
+                result.append(part)
+            if index < len(spans):
+                result.append(spans[index])
+        return ''.join(result)
+
+    async def translate(self, text, dest):
+        """Translate text segment by segment and reassemble it around the protected spans"""
+        tokens = self.segment(text)
+        pieces = [piece for translate, piece in tokens if translate]
+        self.messages += 1
+        self.segments += len(pieces)
+        self.protected_spans += sum(
+            1 if _BLOCK.fullmatch(piece) else len(_mask(piece)[1]) for translate, piece in tokens if not translate
+        )
+        self.chars_total += len(text)
+        if not pieces:
+            return text
+        if len(pieces) > 1:
+            self.split_messages += 1
+
+        translated = iter(await asyncio.gather(*(self._translate_piece(piece, dest) for piece in pieces)))
+        return ''.join(next(translated) if translate else piece for translate, piece in tokens)
+
+    def get_stats(self):
+        return {
+            'max_chars': self.max_chars,
+            'messages': self.messages,
+            'split_messages': self.split_messages,
+            'segments': self.segments,
+            'protected_spans': self.protected_spans,
+            'placeholder_fallbacks': self.placeholder_fallbacks,
+            'chars_total': self.chars_total,
+            'chars_sent': self.chars_sent,
+            'chars_saved': self.chars_total - self.chars_sent
+        }
@@ -0,0 +1,382 @@
+"""
+Sharded multi-process mode for Discord Translation Bot
+A launcher starts worker processes that each run a range of gateway shards. Workers share
+the translation rate-limit budget and publish their stats through one local SQLite file.
+"""
+
+import asyncio
+import json
+import os
+import sqlite3
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import MetricsRegistry
+from translation_backends import RateLimitExceeded
+
+# Discord allows one IDENTIFY per 5 seconds (max_concurrency 1); workers are started staggered
+IDENTIFY_INTERVAL = 5.0
+
+# Stats keys that are averaged (not summed) when merging worker snapshots
+_MEAN_KEYS = {'latency', 'hit_rate', 'rate', 'capacity', 'tokens', 'avg', 'weight', 'min_confidence', 'rss_per_guild_bytes',
+             'lag_seconds', 'rows_per_commit', 'last_commit_ms'}
+
+
+def _connect(db_path):
+    db = sqlite3.connect(db_path, timeout=10, isolation_level=None, check_same_thread=False)
+    db.execute("PRAGMA journal_mode=WAL")
+    db.execute("PRAGMA synchronous=NORMAL")
+    return db
+
+
+def shard_ranges(shard_count, workers):
+    """Split shard ids 0..shard_count-1 into contiguous ranges, one per worker"""
+    workers = max(1, min(workers, shard_count))
+    base, extra = divmod(shard_count, workers)
+    ranges, start = [], 0
+    for worker_id in range(workers):
+        size = base + (1 if worker_id < extra else 0)
+        ranges.append(list(range(start, start + size)))
+        start += size
+    return ranges
+
+
+def shard_of(guild_id, shard_count):
+    """Shard that receives the events of guild_id"""
+    return (guild_id >> 22) % shard_count if shard_count else 0
+
+
+class SharedTokenBucket:
+    """Token bucket stored in SQLite so several processes draw from one budget
+
+    Same interface as TokenBucket. Refill and reservation happen in one
+    IMMEDIATE transaction, so concurrent workers never take the same tokens.
+    """
+    def __init__(self, db_path, name, rate, capacity, max_wait=None):
+        self.name = name
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = capacity  # last value seen by this process
+        self._seen_at = time.time()
+
+        self._db = _connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS token_buckets ("
+            "name TEXT PRIMARY KEY, tokens REAL NOT NULL, updated REAL NOT NULL)"
+        )
+        self._lock = threading.Lock()
+        self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix=f'bucket-{name}')
+
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seen = 0.0
+        self.rejected = 0
+
+    def _take(self, tokens, max_wait):
+        """Refill and, if the wait is acceptable, take tokens; returns (taken, wait)
+
+        max_wait=0 only takes tokens that are available right now; None allows any debt.
+        """
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")  # takes the write lock before reading
+            try:
+                row = self._db.execute(
+                    "SELECT tokens, updated FROM token_buckets WHERE name = ?", (self.name,)
+                ).fetchone()
+                now = time.time()
+                available = self.capacity if row is None else min(self.capacity, row[0] + (now - row[1]) * self.rate)
+                wait = max(0.0, (tokens - available) / self.rate)
+                taken = max_wait is None or wait <= max_wait
+                if taken and tokens > 0:
+                    available -= tokens
+                self._db.execute(
+                    "INSERT OR REPLACE INTO token_buckets (name, tokens, updated) VALUES (?, ?, ?)",
+                    (self.name, available, now)
+                )
+                self._db.execute("COMMIT")
+            except sqlite3.Error:
+                self._db.execute("ROLLBACK")
+                raise
+        self.tokens = available
+        self._seen_at = now
+        return taken, wait
+
+    def time_until(self, tokens=1):
+        """Seconds until tokens are available (0 if they are available now)"""
+        self._take(0, 0)
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def estimated_wait(self, tokens=1):
+        """time_until() from the last value seen, refilled locally; no database access
+
+        Other workers may have taken tokens since, so this is a lower bound for
+        cheap polling on the event loop; acquire() still enforces the real budget.
+        """
+        available = min(self.capacity, self.tokens + (time.time() - self._seen_at) * self.rate)
+        return max(0.0, (tokens - available) / self.rate)
+
+    def is_full(self):
+        self._take(0, 0)
+        return self.tokens >= self.capacity
+
+    def try_acquire(self, tokens=1):
+        """Take tokens without waiting, returns False if not enough are available"""
+        taken, _ = self._take(tokens, 0)
+        if taken:
+            self.acquired += 1
+        return taken
+
+    async def acquire(self, tokens=1):
+        """Wait until tokens are available (raises RateLimitExceeded past max_wait)"""
+        taken, wait = await asyncio.get_running_loop().run_in_executor(self._io, self._take, tokens, self.max_wait)
+        if not taken:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Rate-Limit: Wartezeit {wait:.1f}s")
+
+        self.acquired += 1
+        if wait > 0:
+            self.waits += 1
+            self.wait_seconds += wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+            await asyncio.sleep(wait)
+
+    def get_stats(self):
+        # uses the last value seen instead of a database read on every refresh
+        return {
+            'shared': True,
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'tokens': round(self.tokens, 2),
+            'acquired': self.acquired,
+            'waits': self.waits,
+            'avg_wait_ms': round(self.wait_seconds / self.waits * 1000, 1) if self.waits else 0,
+            'max_wait_ms': round(self.max_wait_seen * 1000, 1),
+            'rejected': self.rejected
+        }
+
+    def close(self):
+        self._io.shutdown(wait=True)
+        with self._lock:
+            self._db.close()
+
+
+class WorkerStatsStore:
+    """Latest stats snapshot of every worker process, one row per worker"""
+    def __init__(self, db_path):
+        self._db = _connect(db_path)
+        self._db.execute(
+            "CREATE TABLE IF NOT EXISTS worker_stats ("
+            "worker_id INTEGER PRIMARY KEY, pid INTEGER NOT NULL, updated REAL NOT NULL, stats TEXT NOT NULL)"
+        )
+        self._lock = threading.Lock()
+
+    def publish(self, worker_id, snapshot):
+        """Write a worker's snapshot (blocking, run it in an executor)"""
+        data = json.dumps(snapshot)
+        with self._lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO worker_stats (worker_id, pid, updated, stats) VALUES (?, ?, ?, ?)",
+                (worker_id, os.getpid(), time.time(), data)
+            )
+
+    def read(self):
+        """worker_id -> (pid, updated, snapshot)"""
+        with self._lock:
+            rows = self._db.execute("SELECT worker_id, pid, updated, stats FROM worker_stats").fetchall()
+        return {worker_id: (pid, updated, json.loads(stats)) for worker_id, pid, updated, stats in rows}
+
+    def clear(self):
+        with self._lock:
+            self._db.execute("DELETE FROM worker_stats")
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def merge_stats(snapshots):
+    """Combine worker stats dicts: counters are summed, rates and latencies averaged, maxima kept"""
+    merged = {}
+    for key in dict.fromkeys(key for snapshot in snapshots for key in snapshot):
+        values = [snapshot[key] for snapshot in snapshots if key in snapshot]
+        if all(isinstance(value, dict) for value in values):
+            merged[key] = merge_stats(values)
+        elif all(isinstance(value, bool) for value in values):
+            merged[key] = any(values)
+        elif all(isinstance(value, (int, float)) for value in values):
+            if key.startswith('max_wait') or key.endswith('_max'):
+                merged[key] = max(values)
+            elif key in _MEAN_KEYS or key.startswith('avg_') or key.endswith('_rate'):
+                merged[key] = round(sum(values) / len(values), 3)
+            else:
+                merged[key] = sum(values)
+        else:
+            distinct = sorted({str(value) for value in values})
+            merged[key] = distinct[0] if len(distinct) == 1 else '/'.join(distinct)
+    return merged
+
+
+class ShardLauncher:
+    """Runs one worker process per shard range and restarts workers that exit"""
+    def __init__(self, script, workers, shard_count, state_db, restart_delay=5.0):
+        self.script = script
+        self.shard_count = shard_count
+        self.state_db = state_db
+        self.restart_delay = restart_delay
+        self.ranges = shard_ranges(shard_count, workers)
+        self._processes = {}  # worker_id -> asyncio.subprocess.Process
+        self.restarts = {worker_id: 0 for worker_id in range(len(self.ranges))}
+
+    def _environment(self, worker_id):
+        env = os.environ.copy()
+        env.update({
+            'WORKER_ID': str(worker_id),
+            'SHARD_IDS': ','.join(str(shard_id) for shard_id in self.ranges[worker_id]),
+            'SHARD_COUNT': str(self.shard_count),
+            'SHARED_STATE_DB': self.state_db
+        })
+        return env
+
+    async def _supervise(self, worker_id, start_delay):
+        await asyncio.sleep(start_delay)
+        while True:
+            process = await asyncio.create_subprocess_exec(
+                sys.executable, self.script, env=self._environment(worker_id)
+            )
+            self._processes[worker_id] = process
+            print(f"🧩 Worker {worker_id} gestartet (PID {process.pid}, Shards {self.ranges[worker_id]})")
+            code = await process.wait()
+            self.restarts[worker_id] += 1
+            print(f"⚠️ Worker {worker_id} beendet (Code {code}), Neustart in {self.restart_delay:.0f}s")
+            await asyncio.sleep(self.restart_delay)
+
+    async def run(self):
+        """Start all workers (staggered by their shard counts) and keep them running"""
+        delay, tasks = 0.0, []
+        for worker_id, shard_ids in enumerate(self.ranges):
+            tasks.append(asyncio.ensure_future(self._supervise(worker_id, delay)))
+            delay += len(shard_ids) * IDENTIFY_INTERVAL
+        try:
+            await asyncio.gather(*tasks)
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def stop(self, timeout=10):
+        for process in self._processes.values():
+            if process.returncode is None:
+                process.terminate()
+        for process in self._processes.values():
+            try:
+                await asyncio.wait_for(process.wait(), timeout)
+            except asyncio.TimeoutError:
+                process.kill()
+
+    def get_stats(self):
+        return {
+            worker_id: {
+                'pid': self._processes[worker_id].pid if worker_id in self._processes else None,
+                'alive': worker_id in self._processes and self._processes[worker_id].returncode is None,
+                'shards': shard_ids,
+                'restarts': self.restarts[worker_id]
+            }
+            for worker_id, shard_ids in enumerate(self.ranges)
+        }
+
+
+class ShardedStats:
+    """Stats source for the web monitor in launcher mode, merges the published worker snapshots
+
+    The top-level counters are accumulated per worker, so they keep growing
+    when a worker restarts or its snapshot goes stale instead of dropping
+    (which the history would read as a counter reset).
+    """
+    COUNTERS = ('translations', 'errors')
+
+    def __init__(self, store, launcher, flag_lang_map, sections, max_age=30):
+        self.store = store
+        self.launcher = launcher
+        self.FLAG_LANG_MAP = flag_lang_map
+        self.max_age = max_age
+        self._previous = {}  # shard_id -> (worker snapshot_at, translations, translations_per_min)
+        self._counted = {}   # worker_id -> (pid, {counter: last value})
+        self._totals = dict.fromkeys(self.COUNTERS, 0)
+
+        self.metrics = MetricsRegistry()
+        self.shard_latency = self.metrics.gauge('translationbot_shard_latency_seconds', 'Gateway-Latenz pro Shard', ('shard',))
+        self.shard_guilds = self.metrics.gauge('translationbot_shard_guilds', 'Server pro Shard', ('shard',))
+        self.shard_translations = self.metrics.gauge(
+            'translationbot_shard_translations', 'Übersetzungen pro Shard seit Start des Workers', ('shard',)
+        )
+        self.metrics.register_collector('translationbot_gateway', lambda: {
+            'ready': self.snapshot['status'] == 'Running',
+            'latency_seconds': self.snapshot.get('latency', 0) / 1000,
+            'guilds': self.snapshot.get('guilds', 0),
+            'users': self.snapshot.get('users', 0)
+        })
+        for section in sections:
+            self.metrics.register_collector(f'translationbot_{section}', lambda section=section: self.snapshot.get(section, {}))
+        self.snapshot = self.collect_stats()
+
+    def collect_stats(self):
+        """Merge the fresh worker snapshots and add per-worker and per-shard details"""
+        now = time.time()
+        workers = self.launcher.get_stats()
+        fresh = []
+        for worker_id, (pid, updated, snapshot) in self.store.read().items():
+            worker = workers.setdefault(worker_id, {'shards': [], 'restarts': 0})
+            worker.update({'pid': pid, 'status': snapshot.get('status'), 'age': round(now - updated, 1),
+                           'translations': snapshot.get('translations', 0)})
+            if now - updated <= self.max_age:
+                fresh.append(snapshot)
+                self._count(worker_id, pid, snapshot)
+
+        sections = [{key: value for key, value in snapshot.items() if key not in ('shards', 'worker')} for snapshot in fresh]
+        stats = merge_stats(sections) if sections else {}
+        stats.update(self._totals)
+        running = [snapshot for snapshot in fresh if snapshot.get('status') == 'Running']
+        stats['status'] = 'Running' if fresh and len(running) == len(workers) else 'Stopped'
+        stats['snapshot_at'] = now
+
+        shards = {}
+        for snapshot in fresh:
+            # rates use the worker's own snapshot times, not when the launcher happened to read them
+            published = snapshot.get('snapshot_at', now)
+            for shard_id, shard in snapshot.get('shards', {}).items():
+                timestamp, previous, per_minute = self._previous.get(shard_id, (None, None, 0))
+                translations = shard.get('translations', 0)
+                if timestamp is None or published > timestamp:
+                    if timestamp is not None and translations >= previous:
+                        per_minute = round((translations - previous) / (published - timestamp) * 60, 1)
+                    else:
+                        per_minute = 0  # first snapshot or the worker restarted
+                    self._previous[shard_id] = (published, translations, per_minute)
+                shards[shard_id] = dict(shard, worker=snapshot.get('worker'), translations_per_min=per_minute)
+                self.shard_latency.set(shard.get('latency', 0) / 1000, shard=shard_id)
+                self.shard_guilds.set(shard.get('guilds', 0), shard=shard_id)
+                self.shard_translations.set(translations, shard=shard_id)
+        if shards:
+            stats['latency'] = round(sum(shard.get('latency', 0) for shard in shards.values()) / len(shards), 2)
+        stats['shards'] = dict(sorted(shards.items(), key=lambda item: int(item[0])))
+        stats['workers'] = {str(worker_id): worker for worker_id, worker in sorted(workers.items())}
+        return stats
+
+    def _count(self, worker_id, pid, snapshot):
+        """Add a worker's counter increments since its previous snapshot to the totals"""
+        previous_pid, previous = self._counted.get(worker_id, (None, {}))
+        if pid != previous_pid:
+            previous = {}  # new process: its counters started from zero
+        values = {}
+        for counter in self.COUNTERS:
+            value = snapshot.get(counter, 0)
+            last = previous.get(counter, 0)
+            self._totals[counter] += value - last if value >= last else value
+            values[counter] = value
+        self._counted[worker_id] = (pid, values)
+
+    def get_stats(self):
+        return dict(self.snapshot)
@@ -0,0 +1,125 @@
+import asyncio
+import sqlite3
+
+from journal import JobJournal
+
+
+def rows(path):
+    db = sqlite3.connect(path)
+    try:
+        return db.execute("SELECT job_id, event FROM jobs ORDER BY seq").fetchall()
+    finally:
+        db.close()
+
+
+def test_unfinished_jobs_are_replayed_after_a_restart(tmp_path):
+    path = str(tmp_path / 'journal.db')
+
+    async def crash():
+        journal = JobJournal(flush_interval=0.01)
+        journal.open(path)
+        running = journal.start(('guild', 1, 'de'), {'message_id': 1})
+        done = journal.start(('guild', 2, 'de'), {'message_id': 2})
+        await asyncio.sleep(0.05)  # both starts committed
+        journal.complete(done)
+        await asyncio.sleep(0.05)
+        return running, journal  # never closed: the process died here
+
+    running, _ = asyncio.run(crash())
+    journal = JobJournal()
+    journal.open(path)
+    assert journal.take_replay() == [(running, {'message_id': 1})]
+    assert journal.take_replay() == []
+    # a new job gets a fresh id, the replayed one still blocks its key until completed
+    assert journal.start(('guild', 3, 'de'), {}) > running
+    assert journal.start(('guild', 1, 'de'), {}) is None
+    journal.complete(running)
+    journal.close()
+
+    restarted = JobJournal()
+    restarted.open(path)
+    assert [job_id for job_id, _ in restarted.take_replay()] == [running + 2]
+    restarted.close()
+
+
+def test_one_job_per_key(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = JobJournal()
+    journal.open(path)
+    first = journal.start(('guild', 1, 'de'), {})
+    assert journal.start(('guild', 1, 'de'), {}) is None
+    assert journal.start(('guild', 1, 'fr'), {}) is not None
+    assert journal.duplicates == 1
+    journal.complete(first)
+    assert journal.start(('guild', 1, 'de'), {}) is not None
+    journal.close()
+
+
+def test_replay_keeps_one_job_per_key(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = JobJournal()
+    journal.open(path)
+    first = journal.start(('guild', 1, 'de'), {'message_id': 1})
+    journal.close()
+    # a second start row for the same key, e.g. from a run that replayed and crashed again
+    db = sqlite3.connect(path)
+    db.execute(
+        "INSERT INTO jobs (job_id, event, ts, data) SELECT ?, 'start', ts, data FROM jobs WHERE job_id = ?",
+        (first + 1, first)
+    )
+    db.commit()
+    db.close()
+
+    journal = JobJournal()
+    journal.open(path)
+    assert journal.take_replay() == [(first, {'message_id': 1})]
+    assert journal.replay_deduped == 1
+    journal.close()
+    # marked done on open and pruned in the same commit
+    assert rows(path) == [(first, 'start')]
+
+
+def test_old_jobs_expire_instead_of_being_replayed(tmp_path):
+    path = str(tmp_path / 'journal.db')
+    journal = JobJournal()
+    journal.open(path)
+    old = journal.start(('guild', 1, 'de'), {})
+    recent = journal.start(('guild', 2, 'de'), {})
+    journal.close()
+    db = sqlite3.connect(path)
+    db.execute("UPDATE jobs SET ts = ts - 7200 WHERE job_id = ?", (old,))
+    db.commit()
+    db.close()
+
+    journal = JobJournal()
+    journal.open(path, replay_max_age=3600)
+    assert [job_id for job_id, _ in journal.take_replay()] == [recent]
+    assert journal.replay_expired == 1
+    journal.close()
+    assert rows(path) == [(recent, 'start')]
+
+    journal = JobJournal()
+    journal.open(path, replay_max_age=3600)
+    assert [job_id for job_id, _ in journal.take_replay()] == [recent]
+    assert journal.replay_expired == 0
+    journal.close()
+
+
+def test_jobs_finished_before_the_commit_are_never_written(tmp_path):
+    path = str(tmp_path / 'journal.db')
+
+    async def run():
+        journal = JobJournal(flush_interval=0.05)
+        journal.open(path)
+        quick = journal.start(('guild', 1, 'de'), {})
+        slow = journal.start(('guild', 2, 'de'), {})
+        journal.complete(quick)  # same group as its start: both are dropped
+        await asyncio.sleep(0.15)
+        journal.complete(slow)
+        journal.close()
+        return journal, slow
+
+    journal, slow = asyncio.run(run())
+    assert journal.elided == 1
+    assert rows(path) == [(slow, 'start'), (slow, 'done')]
+    assert journal.get_stats()['rows_written'] == 2
@@ -0,0 +1,81 @@
+import asyncio
+from types import SimpleNamespace
+
+import pytest
+
+pytest.importorskip('discord')
+
+import discord  # noqa: E402
+
+from outbox import Outbox, split_message  # noqa: E402
+
+
+@pytest.mark.parametrize('limit', [40, 100, 2000])
+def test_chunks_respect_the_limit_and_keep_the_text(limit):
+    text = ("Ein Satz mit ein paar Wörtern. " * 200).strip()
+    chunks = split_message(text, limit)
+    assert all(len(chunk) <= limit for chunk in chunks)
+    assert ' '.join(chunks).split() == text.split()
+
+
+def test_prefers_paragraph_boundaries():
+    text = "a" * 50 + "\n\n" + "b" * 50
+    assert split_message(text, 80) == ["a" * 50, "b" * 50]
+
+
+@pytest.mark.parametrize('cluster', ["👨‍👩‍👧‍👦", "🇩🇪", "👍🏽", "é", "🏴󠁧󠁢󠁥󠁮󠁧󠁿"])
+def test_never_cuts_through_a_grapheme(cluster):
+    text = cluster * 300
+    chunks = split_message(text, 100)
+    assert ''.join(chunks) == text
+    assert all(len(chunk) % len(cluster) == 0 for chunk in chunks)
+
+
+def test_code_blocks_are_closed_and_reopened():
+    text = "```py\n" + "\n".join(f"print({i})" for i in range(300)) + "\n```"
+    chunks = split_message(text, 200)
+    assert len(chunks) > 1
+    for chunk in chunks:
+        assert len(chunk) <= 200
+        assert chunk.startswith("```py\n")
+        assert chunk.endswith("```")
+
+
+def test_fence_line_longer_than_a_chunk_terminates():
+    chunks = split_message("```" + "x" * 2500 + "```")
+    assert all(len(chunk) <= 2000 for chunk in chunks)
+    assert ''.join(chunks).count("x") == 2500
+
+
+class Destination:
+    def __init__(self, id, fail_first=0):
+        self.id = id
+        self.sent = []
+        self.fail_first = fail_first
+
+    async def send(self, content=None, **kwargs):
+        if self.fail_first:
+            self.fail_first -= 1
+            error = discord.HTTPException(SimpleNamespace(status=429, reason='Too Many Requests'), 'rate limited')
+            error.status = 429
+            error.retry_after = 0.3
+            raise error
+        self.sent.append(content)
+
+
+def test_blocked_route_does_not_stall_other_routes():
+    async def run():
+        outbox = Outbox(workers=1, base_backoff=0.3)
+        blocked = Destination(1, fail_first=1)
+        outbox.send(blocked, [{'content': 'a'}])
+        outbox.send(blocked, [{'content': 'b'}])  # same route, waits for the block
+        free = Destination(2)
+        outbox.send(free, [{'content': 'c'}])
+        await asyncio.sleep(0.1)
+        assert free.sent == ['c'] and blocked.sent == []
+        assert outbox.get_stats()['delayed'] == 2
+        await asyncio.sleep(0.5)
+        assert sorted(blocked.sent) == ['a', 'b']
+        assert outbox.get_stats()['blocked_routes'] == 0
+
+    asyncio.run(run())
@@ -0,0 +1,50 @@
+import asyncio
+from types import SimpleNamespace
+
+from prewarm import Prewarmer
+from translation_backends import TokenBucket
+
+
+def make_service(in_flight=0, max_concurrent=4, rate_limiter=None):
+    return SimpleNamespace(
+        queued=0, in_flight=in_flight, max_concurrent=max_concurrent,
+        batcher=None, breaker=None, rate_limiter=rate_limiter
+    )
+
+
+def make_prewarmer(service, items=10):
+    prewarmer = Prewarmer(None, service, batch_size=10)
+    prewarmer._pending.extend((i, f"text {i}", 'de') for i in range(items))
+    return prewarmer
+
+
+def test_batch_is_capped_by_free_concurrency():
+    assert make_prewarmer(make_service(in_flight=3))._capacity() == 1
+    assert make_prewarmer(make_service(in_flight=0))._capacity() == 4
+
+
+def test_batch_is_capped_by_available_tokens():
+    service = make_service(max_concurrent=10, rate_limiter=TokenBucket(rate=0.001, capacity=3))
+    assert make_prewarmer(service)._capacity() == 3
+    assert make_prewarmer(service, items=2)._capacity() == 2
+
+
+def test_run_leaves_the_rest_for_later():
+    service = make_service(in_flight=2)
+    started = []
+
+    async def translate(text, dest):
+        started.append(text)
+        service.in_flight = 4  # the service is now full, the next batch has to wait
+
+    async def run():
+        prewarmer = Prewarmer(translate, service, batch_size=10, idle_poll=0.01)
+        prewarmer.submit(1, "hello", ['de', 'fr', 'es', 'it'])
+        await asyncio.sleep(0.05)
+        prewarmer._task.cancel()
+        return prewarmer
+
+    prewarmer = asyncio.run(run())
+    assert len(started) == 2
+    assert prewarmer.get_stats()['pending'] == 2
+    assert prewarmer.deferred >= 1
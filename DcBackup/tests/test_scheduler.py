@@ -0,0 +1,29 @@
+import asyncio
+
+from scheduler import FairScheduler
+
+
+def test_cancelled_jobs_do_not_use_up_the_guild_quota():
+    # two tokens that never refill during the test: one for the blocker, one for the next live job
+    scheduler = FairScheduler(concurrency=1, guild_rate=0.001, guild_burst=2)
+
+    async def run():
+        release = asyncio.Event()
+
+        async def blocker():
+            await release.wait()
+            return 'blocker'
+
+        async def job():
+            return 'live'
+
+        first = asyncio.ensure_future(scheduler.submit(1, blocker))
+        cancelled = asyncio.ensure_future(scheduler.submit(1, job))
+        live = asyncio.ensure_future(scheduler.submit(1, job))
+        await asyncio.sleep(0.01)
+        cancelled.cancel()
+        release.set()
+        return await asyncio.wait_for(asyncio.gather(first, live), 1)
+
+    assert asyncio.run(run()) == ['blocker', 'live']
+    assert scheduler.get_stats()['queued'] == 0
@@ -0,0 +1,87 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('discord')  # segmenter -> outbox
+
+from segmenter import MessageSegmenter  # noqa: E402
+
+
+class Upstream:
+    """Records what is sent upstream and 'translates' by upper-casing"""
+    def __init__(self, mangle=False):
+        self.sent = []
+        self.mangle = mangle
+
+    async def __call__(self, text, dest):
+        self.sent.append(text)
+        if self.mangle:
+            text = text.replace('⟦', '[').replace('⟧', ']')
+        return text.upper()
+
+
+def translate(text, upstream, max_chars=1500):
+    segmenter = MessageSegmenter(upstream, max_chars=max_chars)
+    return asyncio.run(segmenter.translate(text, 'en')), segmenter
+
+
+@pytest.mark.parametrize('text', [
+    "Hey <@123>, kannst du bitte **heute** den Link https://example.com prüfen?",
+    "> Zitat\n# Titel\nText mit ||Spoiler|| und ~~weg~~ `code . here` :smile:",
+    "Vorher\n```py\nprint('x')\n```\nNachher",
+    "<@1> :tada:",
+    "Literal ⟦0⟧ text here",
+])
+def test_segments_join_back_to_the_text(text):
+    assert ''.join(piece for _, piece in MessageSegmenter(None).segment(text)) == text
+
+
+def test_inline_spans_stay_inside_the_sentence():
+    upstream = Upstream()
+    result, _ = translate("Hey <@123>, kannst du bitte **heute** den Link https://example.com prüfen?", upstream)
+    assert upstream.sent == ["Hey ⟦0⟧, kannst du bitte ⟦1⟧heute⟦2⟧ den Link ⟦3⟧ prüfen?"]
+    assert result == "HEY <@123>, KANNST DU BITTE **HEUTE** DEN LINK https://example.com PRÜFEN?"
+
+
+def test_markdown_prefixes_and_markers_are_not_sent():
+    upstream = Upstream()
+    result, _ = translate("> Zitat hier\n# Titel\nText mit ||Spoiler|| und __Unterstrich__", upstream)
+    assert upstream.sent == ["Zitat hier\n⟦0⟧Titel\nText mit ⟦1⟧Spoiler⟦2⟧ und ⟦3⟧Unterstrich"]
+    assert result == "> ZITAT HIER\n# TITEL\nTEXT MIT ||SPOILER|| UND __UNTERSTRICH__"
+
+
+def test_code_blocks_split_segments():
+    upstream = Upstream()
+    result, _ = translate("Vorher\n```py\nprint('x')\n```\nNachher", upstream)
+    assert upstream.sent == ["Vorher", "Nachher"]
+    assert result == "VORHER\n```py\nprint('x')\n```\nNACHHER"
+
+
+def test_colons_in_prose_are_not_shortcodes():
+    upstream = Upstream()
+    translate("note:this: is fine :smile: ok", upstream)
+    assert upstream.sent == ["note:this: is fine ⟦0⟧ ok"]
+
+
+def test_only_markup_is_not_sent():
+    upstream = Upstream()
+    result, _ = translate("<@1> :tada: https://example.com", upstream)
+    assert upstream.sent == []
+    assert result == "<@1> :tada: https://example.com"
+
+
+def test_mangled_placeholders_fall_back_to_pieces():
+    upstream = Upstream(mangle=True)
+    result, segmenter = translate("Hallo <@123> wie geht es dir", upstream)
+    assert result == "HALLO <@123> WIE GEHT ES DIR"
+    assert upstream.sent[1:] == ["Hallo", "wie geht es dir"]
+    assert segmenter.placeholder_fallbacks == 1
+
+
+def test_long_prose_is_split_on_sentences():
+    upstream = Upstream()
+    text = "Erster Satz mit <@1> drin. Zweiter Satz folgt hier. Dritter Satz ist auch da."
+    result, _ = translate(text, upstream, max_chars=30)
+    assert result == text.upper()
+    assert all(len(sent) <= 30 for sent in upstream.sent)
+    assert len(upstream.sent) == 3
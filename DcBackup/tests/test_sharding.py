@@ -0,0 +1,58 @@
+import time
+
+from sharding import SharedTokenBucket, ShardedStats
+
+
+def test_estimated_wait_does_not_touch_the_database(tmp_path):
+    bucket = SharedTokenBucket(str(tmp_path / 'state.db'), 'translate', rate=10, capacity=2)
+    assert bucket.try_acquire(2)
+    bucket.close()  # any database access would fail from here on
+    assert 0 < bucket.estimated_wait(1) <= 0.1
+    bucket._seen_at -= 1  # a second later the local refill covers it
+    assert bucket.estimated_wait(1) == 0
+
+
+class FakeStore:
+    def __init__(self):
+        self.rows = {}
+
+    def publish(self, worker_id, pid, updated, snapshot):
+        self.rows[worker_id] = (pid, updated, snapshot)
+
+    def read(self):
+        return dict(self.rows)
+
+
+class FakeLauncher:
+    def get_stats(self):
+        return {0: {'shards': [0], 'restarts': 0}, 1: {'shards': [1], 'restarts': 0}}
+
+
+def snapshot(translations, published, shard):
+    return {'status': 'Running', 'translations': translations, 'errors': 0, 'snapshot_at': published,
+            'shards': {str(shard): {'latency': 50, 'guilds': 1, 'translations': translations}}}
+
+
+def test_counters_do_not_drop_when_a_worker_restarts_or_goes_stale():
+    store, now = FakeStore(), time.time()
+    store.publish(0, 100, now, snapshot(50, now, 0))
+    store.publish(1, 200, now, snapshot(30, now, 1))
+    stats = ShardedStats(store, FakeLauncher(), {}, (), max_age=30)
+    assert stats.collect_stats()['translations'] == 80
+
+    store.publish(1, 200, now - 60, snapshot(30, now - 60, 1))  # stale
+    assert stats.collect_stats()['translations'] == 80
+
+    store.publish(1, 201, now, snapshot(5, now, 1))  # restarted, counts from zero again
+    store.publish(0, 100, now, snapshot(60, now, 0))
+    assert stats.collect_stats()['translations'] == 95
+
+
+def test_shard_rate_uses_the_workers_snapshot_times():
+    store = FakeStore()
+    store.publish(0, 100, 1000.0, snapshot(0, 1000.0, 0))
+    stats = ShardedStats(store, FakeLauncher(), {}, (), max_age=float('inf'))
+    store.publish(0, 100, 1010.0, snapshot(10, 1010.0, 0))
+    assert stats.collect_stats()['shards']['0']['translations_per_min'] == 60.0
+    # read again before the worker published anything new: the rate stays
+    assert stats.collect_stats()['shards']['0']['translations_per_min'] == 60.0
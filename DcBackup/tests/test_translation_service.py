@@ -0,0 +1,39 @@
+import asyncio
+import threading
+
+from translation_backends import StubBackend, TranslationBackend
+from translation_service import TranslationService
+
+
+class SerialBackend(TranslationBackend):
+    """No bulk endpoint: records which thread handled each text"""
+    name = 'serial'
+
+    def __init__(self):
+        self.threads = []
+
+    def translate_batch(self, texts, dest):
+        self.threads.append((threading.get_ident(), len(texts)))
+        return [f"[{dest}] {text}" for text in texts]
+
+
+def test_backends_without_bulk_endpoint_are_not_batched():
+    backend = SerialBackend()
+    service = TranslationService(backend, batch_size=10)
+    assert service.batcher is None
+
+    async def run():
+        return await asyncio.gather(*(service.translate(f"text {i}", 'de') for i in range(4)))
+
+    assert asyncio.run(run()) == [f"[de] text {i}" for i in range(4)]
+    assert all(size == 1 for _, size in backend.threads)
+    service.close()
+
+
+def test_bulk_backends_are_batched_up_to_their_limit():
+    class SmallBulkBackend(StubBackend):
+        max_batch_size = 3
+
+    service = TranslationService(SmallBulkBackend(), batch_size=10)
+    assert service.batcher.max_batch_size == 3
+    service.close()
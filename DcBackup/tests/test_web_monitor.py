@@ -0,0 +1,19 @@
+import asyncio
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from web_monitor import StatsStream  # noqa: E402
+
+
+def test_close_wakes_every_subscriber():
+    async def run():
+        stream = StatsStream(client_buffer=2)
+        queues = [stream.subscribe() for _ in range(3)]
+        stream.publish({'translations': 1})
+        stream.publish({'translations': 2})
+        stream.close()
+        return [await asyncio.wait_for(queue.get(), 1) for queue in queues]
+
+    assert asyncio.run(run()) == [None, None, None]
@@ -0,0 +1,224 @@
+"""
+Translation backends for Discord Translation Bot
+Pluggable upstream clients plus the rate limiter and circuit breaker that guard them
+"""
+
+import asyncio
+import time
+
+
+class TranslationUnavailable(Exception):
+    """Upstream is overloaded or failing; the request was not attempted"""
+
+
+class CircuitOpenError(TranslationUnavailable):
+    """Raised while the circuit breaker is open"""
+
+
+class RateLimitExceeded(TranslationUnavailable):
+    """Raised when waiting for the rate limiter would take too long"""
+
+
+class TranslationBackend:
+    """Base class for upstream translation clients (called from worker threads)
+
+    max_batch_size is how many texts one upstream request can carry. Backends
+    without a bulk endpoint keep 1, so each text gets its own worker thread
+    instead of queueing behind the others in one translate_batch() call.
+    """
+    name = 'base'
+    max_batch_size = 1
+
+    def translate_batch(self, texts, dest):
+        """Translate every text into dest, returns a list of strings in the same order"""
+        raise NotImplementedError
+
+
+class GoogleTransBackend(TranslationBackend):
+    """googletrans web client
+
+    googletrans translates a list one item after another (one HTTP request
+    each), so batching would only serialize requests on a single thread.
+    """
+    name = 'googletrans'
+
+    def __init__(self):
+        from googletrans import Translator
+        self._translator = Translator()
+
+    def translate_batch(self, texts, dest):
+        return [result.text for result in self._translator.translate(list(texts), dest=dest)]
+
+
+class StubBackend(TranslationBackend):
+    """Deterministic offline backend for local testing"""
+    name = 'stub'
+    max_batch_size = 100  # one call per list, like a bulk endpoint
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+
+    def translate_batch(self, texts, dest):
+        if self.latency:
+            time.sleep(self.latency)
+        return [f"[{dest}] {text}" for text in texts]
+
+
+BACKENDS = {
+    GoogleTransBackend.name: GoogleTransBackend,
+    StubBackend.name: StubBackend
+}
+
+
+def create_backend(name, **kwargs):
+    """Instantiate a backend by its configured name"""
+    try:
+        backend_class = BACKENDS[name]
+    except KeyError:
+        raise ValueError(f"Unbekanntes Übersetzungs-Backend: {name} (verfügbar: {', '.join(BACKENDS)})")
+    return backend_class(**kwargs)
+
+
+class TokenBucket:
+    """Async token bucket; waiters reserve tokens so they are served in order"""
+    def __init__(self, rate, capacity, max_wait=None):
+        self.rate = rate
+        self.capacity = capacity
+        self.max_wait = max_wait
+        self.tokens = capacity
+        self._updated = time.monotonic()
+
+        self.acquired = 0
+        self.waits = 0
+        self.wait_seconds = 0.0
+        self.max_wait_seen = 0.0
+        self.rejected = 0
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def time_until(self, tokens=1):
+        """Seconds until tokens are available (0 if they are available now)"""
+        self._refill()
+        return max(0.0, (tokens - self.tokens) / self.rate)
+
+    def estimated_wait(self, tokens=1):
+        """Same as time_until(); SharedTokenBucket answers this without a database round trip"""
+        return self.time_until(tokens)
+
+    def is_full(self):
+        self._refill()
+        return self.tokens >= self.capacity
+
+    def try_acquire(self, tokens=1):
+        """Take tokens without waiting, returns False if not enough are available"""
+        self._refill()
+        if self.tokens < tokens:
+            return False
+        self.tokens -= tokens
+        self.acquired += 1
+        return True
+
+    async def acquire(self, tokens=1):
+        """Wait until tokens are available (raises RateLimitExceeded past max_wait)"""
+        self._refill()
+        wait = (tokens - self.tokens) / self.rate if self.tokens < tokens else 0.0
+        if self.max_wait is not None and wait > self.max_wait:
+            self.rejected += 1
+            raise RateLimitExceeded(f"Rate-Limit: Wartezeit {wait:.1f}s")
+
+        self.tokens -= tokens
+        self.acquired += 1
+        if wait > 0:
+            self.waits += 1
+            self.wait_seconds += wait
+            self.max_wait_seen = max(self.max_wait_seen, wait)
+            await asyncio.sleep(wait)
+
+    def get_stats(self):
+        self._refill()
+        return {
+            'rate': self.rate,
+            'capacity': self.capacity,
+            'tokens': round(self.tokens, 2),
+            'acquired': self.acquired,
+            'waits': self.waits,
+            'avg_wait_ms': round(self.wait_seconds / self.waits * 1000, 1) if self.waits else 0,
+            'max_wait_ms': round(self.max_wait_seen * 1000, 1),
+            'rejected': self.rejected
+        }
+
+
+class CircuitBreaker:
+    """Stops calling a failing upstream and probes it again after a cool-down"""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+        self.failures = 0
+        self.successes = 0
+        self.short_circuited = 0
+        self.times_opened = 0
+
+    def check(self):
+        """Fail fast while open; does not claim the half-open probe"""
+        if self.state == self.OPEN and time.monotonic() - self.opened_at < self.reset_timeout:
+            self.short_circuited += 1
+            raise CircuitOpenError("Übersetzungsdienst vorübergehend gesperrt (Circuit Breaker offen)")
+
+    def before_call(self):
+        """Admit a call, moving to half-open once the cool-down has passed"""
+        self.check()
+        if self.state == self.OPEN:
+            self.state = self.HALF_OPEN
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight:
+                self.short_circuited += 1
+                raise CircuitOpenError("Übersetzungsdienst wird gerade getestet (Circuit Breaker halb offen)")
+            self._probe_in_flight = True
+
+    def record_success(self):
+        self.successes += 1
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+        self.state = self.CLOSED
+
+    def record_failure(self):
+        self.failures += 1
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                self.times_opened += 1
+                print(f"🔌 Circuit Breaker geöffnet nach {self.consecutive_failures} Fehlern")
+            self.state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def release(self):
+        """Give back a half-open probe whose call was cancelled"""
+        self._probe_in_flight = False
+
+    def get_stats(self):
+        retry_in = 0
+        if self.state == self.OPEN:
+            retry_in = max(0, self.reset_timeout - (time.monotonic() - self.opened_at))
+        return {
+            'state': self.state,
+            'consecutive_failures': self.consecutive_failures,
+            'failure_threshold': self.failure_threshold,
+            'retry_in': round(retry_in, 1),
+            'failures': self.failures,
+            'successes': self.successes,
+            'short_circuited': self.short_circuited,
+            'times_opened': self.times_opened
+        }
@@ -0,0 +1,199 @@
+"""
+Two-tier translation cache for Discord Translation Bot
+In-memory LRU with TTL in front of a persistent SQLite store
+"""
+
+import asyncio
+import hashlib
+import sqlite3
+import sys
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class TranslationCache:
+    """LRU memory tier plus an SQLite disk tier that survives restarts"""
+    def __init__(self, max_entries=5000, ttl=3600, db_path=None,
+                 disk_max_entries=100000, disk_ttl=30 * 86400):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_path = db_path
+        self.disk_max_entries = disk_max_entries
+        self.disk_ttl = disk_ttl
+
+        self._memory = OrderedDict()  # key -> (expires_at, text)
+        self.memory_bytes = 0
+
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+        self.disk_evictions = 0
+        self.disk_errors = 0
+        self.disk_entries = 0
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        self._io = None
+        self._writes_since_trim = 0
+        if db_path:
+            self._open_db()
+
+    @staticmethod
+    def make_key(text, dest):
+        """Stable key for a (text, target language) pair"""
+        return hashlib.sha256(f"{dest}\0{text}".encode('utf-8')).hexdigest()
+
+    def _open_db(self):
+        try:
+            self._db = sqlite3.connect(self.db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS translations ("
+                "key TEXT PRIMARY KEY, text TEXT NOT NULL, created_at REAL NOT NULL)"
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_translations_created ON translations(created_at)")
+            self._db.commit()
+            self.disk_entries = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+            self._io = ThreadPoolExecutor(max_workers=1, thread_name_prefix='translation-cache')
+        except sqlite3.Error as e:
+            print(f"⚠️ Übersetzungs-Cache auf Festplatte nicht verfügbar: {e}")
+            self._db = None
+
+    # Memory tier
+
+    @staticmethod
+    def _entry_size(key, text):
+        return sys.getsizeof(key) + sys.getsizeof(text)
+
+    def _memory_get(self, key):
+        entry = self._memory.get(key)
+        if entry is None:
+            return None
+        expires_at, text = entry
+        if expires_at < time.monotonic():
+            del self._memory[key]
+            self.memory_bytes -= self._entry_size(key, text)
+            self.expirations += 1
+            return None
+        self._memory.move_to_end(key)
+        return text
+
+    def _memory_put(self, key, text):
+        old = self._memory.pop(key, None)
+        if old is not None:
+            self.memory_bytes -= self._entry_size(key, old[1])
+        self._memory[key] = (time.monotonic() + self.ttl, text)
+        self.memory_bytes += self._entry_size(key, text)
+        while len(self._memory) > self.max_entries:
+            old_key, (_, old_text) = self._memory.popitem(last=False)
+            self.memory_bytes -= self._entry_size(old_key, old_text)
+            self.evictions += 1
+
+    # Disk tier (runs on the cache's own IO thread)
+
+    def _disk_get(self, key):
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT text, created_at FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+        if row is None or row[1] < time.time() - self.disk_ttl:
+            return None
+        return row[0]
+
+    def _disk_put(self, key, text):
+        with self._db_lock:
+            cursor = self._db.execute(
+                "INSERT OR REPLACE INTO translations (key, text, created_at) VALUES (?, ?, ?)",
+                (key, text, time.time())
+            )
+            self._db.commit()
+            self._writes_since_trim += 1
+            if self._writes_since_trim >= 500:
+                self._writes_since_trim = 0
+                self._disk_trim()
+            else:
+                self.disk_entries += cursor.rowcount
+
+    def _disk_trim(self):
+        """Drop expired rows and the oldest rows above disk_max_entries"""
+        self._db.execute("DELETE FROM translations WHERE created_at < ?", (time.time() - self.disk_ttl,))
+        count = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+        if count > self.disk_max_entries:
+            removed = count - self.disk_max_entries
+            self._db.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY created_at LIMIT ?)",
+                (removed,)
+            )
+            self.disk_evictions += removed
+            count = self.disk_max_entries
+        self._db.commit()
+        self.disk_entries = count
+
+    # Public API
+
+    async def get(self, key):
+        """Return the cached translation for key, or None"""
+        text = self._memory_get(key)
+        if text is not None:
+            self.memory_hits += 1
+            return text
+
+        if self._db is not None:
+            try:
+                text = await asyncio.get_running_loop().run_in_executor(self._io, self._disk_get, key)
+            except sqlite3.Error as e:
+                self.disk_errors += 1
+                print(f"⚠️ Cache-Lesefehler: {e}")
+                text = None
+            if text is not None:
+                self.disk_hits += 1
+                self._memory_put(key, text)
+                return text
+
+        self.misses += 1
+        return None
+
+    def put(self, key, text):
+        """Store a translation in memory and queue the disk write in the background"""
+        self._memory_put(key, text)
+        if self._db is not None:
+            self._io.submit(self._disk_put_logged, key, text)
+
+    def _disk_put_logged(self, key, text):
+        try:
+            self._disk_put(key, text)
+        except sqlite3.Error as e:
+            self.disk_errors += 1
+            print(f"⚠️ Cache-Schreibfehler: {e}")
+
+    def get_stats(self):
+        lookups = self.memory_hits + self.disk_hits + self.misses
+        return {
+            'memory_entries': len(self._memory),
+            'memory_max_entries': self.max_entries,
+            'memory_bytes': self.memory_bytes,
+            'disk_enabled': self._db is not None,
+            'disk_entries': self.disk_entries,
+            'memory_hits': self.memory_hits,
+            'disk_hits': self.disk_hits,
+            'misses': self.misses,
+            'hit_rate': round((self.memory_hits + self.disk_hits) / lookups, 3) if lookups else 0,
+            'evictions': self.evictions,
+            'expirations': self.expirations,
+            'disk_evictions': self.disk_evictions,
+            'disk_errors': self.disk_errors
+        }
+
+    def close(self):
+        if self._io is not None:
+            self._io.shutdown(wait=True)
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+            self._db = None
@@ -0,0 +1,240 @@
+"""
+Async translation service for Discord Translation Bot
+Runs the blocking backend in a bounded worker pool off the Discord event loop
+"""
+
+import asyncio
+import functools
+from concurrent.futures import ThreadPoolExecutor
+
+from metrics import Histogram
+from translation_backends import TranslationUnavailable
+
+
+class TranslationQueueFull(TranslationUnavailable):
+    """Raised when too many translations are already waiting for a worker"""
+
+
+class SingleFlight:
+    """Merges concurrent calls with the same key into one shared execution"""
+    def __init__(self):
+        self._flights = {}
+        self.started = 0
+        self.merged = 0
+
+    async def run(self, key, factory):
+        """Await factory() once per key; concurrent callers share the result"""
+        future = self._flights.get(key)
+        if future is not None:
+            self.merged += 1
+        else:
+            future = asyncio.ensure_future(factory())
+            self._flights[key] = future
+            self.started += 1
+            future.add_done_callback(functools.partial(self._finished, key))
+        # shield: a cancelled waiter must not cancel the shared work for the others
+        return await asyncio.shield(future)
+
+    def _finished(self, key, future):
+        if self._flights.get(key) is future:
+            del self._flights[key]
+
+    def get_stats(self):
+        return {
+            'in_flight': len(self._flights),
+            'started': self.started,
+            'merged': self.merged
+        }
+
+
+class TranslationBatcher:
+    """Collects translation requests per target language into batched upstream calls"""
+    def __init__(self, run_batch, max_batch_size=10, max_wait=0.02):
+        self._run_batch = run_batch
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait
+        self._pending = {}  # dest -> [(text, future, enqueued_at), ...]
+        self._timers = {}   # dest -> TimerHandle
+        self._tasks = set()
+
+        self.batches = 0
+        self.batch_sizes = Histogram(
+            'translationbot_batch_size', 'Texte pro gebündeltem Upstream-Aufruf',
+            buckets=(1, 2, 4, 8, 16, 32, 64)
+        )
+        self.wait_seconds = Histogram(
+            'translationbot_batch_wait_seconds', 'Wartezeit einer Übersetzung im Batch-Fenster',
+            buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+        )
+
+    @property
+    def pending(self):
+        return sum(len(batch) for batch in self._pending.values())
+
+    async def submit(self, text, dest):
+        """Queue text for the next batch into dest and wait for its translation"""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        batch = self._pending.setdefault(dest, [])
+        batch.append((text, future, loop.time()))
+        if len(batch) >= self.max_batch_size:
+            self._flush(dest)
+        elif dest not in self._timers:
+            self._timers[dest] = loop.call_later(self.max_wait, self._flush, dest)
+        return await future
+
+    def _flush(self, dest):
+        timer = self._timers.pop(dest, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(dest, None)
+        if batch:
+            task = asyncio.ensure_future(self._send(dest, batch))
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+    async def _send(self, dest, batch):
+        now = asyncio.get_running_loop().time()
+        for _, _, enqueued_at in batch:
+            self.wait_seconds.observe(now - enqueued_at)
+
+        # identical texts in one window are only translated once
+        texts = list(dict.fromkeys(text for text, _, _ in batch))
+        self.batches += 1
+        self.batch_sizes.observe(len(texts))
+        try:
+            results = dict(zip(texts, await self._run_batch(texts, dest)))
+        except Exception as e:
+            for _, future, _ in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for text, future, _ in batch:
+            if not future.done():
+                future.set_result(results[text])
+
+    def get_stats(self):
+        return {
+            'max_batch_size': self.max_batch_size,
+            'max_wait_ms': round(self.max_wait * 1000, 1),
+            'pending': self.pending,
+            'batches': self.batches,
+            'batch_size': self.batch_sizes.to_dict(),
+            'wait_seconds': self.wait_seconds.to_dict()
+        }
+
+
+class TranslationService:
+    """Awaitable front-end for a synchronous backend with a concurrency cap"""
+    def __init__(self, backend, max_workers=4, max_concurrent=4, max_queue=100, cache=None,
+                 batch_size=10, batch_wait=0.02, rate_limiter=None, breaker=None):
+        self.backend = backend
+        self.cache = cache
+        self.rate_limiter = rate_limiter
+        self.breaker = breaker
+        self.max_workers = max_workers
+        self.max_concurrent = max_concurrent
+        self.max_queue = max_queue
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='translate')
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+        self.batcher = None
+        # batching only pays off if the backend sends a whole batch in one upstream request
+        batch_size = min(batch_size, backend.max_batch_size)
+        if batch_size > 1:
+            self.batcher = TranslationBatcher(self._run, max_batch_size=batch_size, max_wait=batch_wait)
+
+        self.queued = 0
+        self.in_flight = 0
+        self.completed = 0
+        self.failed = 0
+        self.rejected = 0
+
+    async def translate(self, text, dest):
+        """Translate text into dest without blocking the event loop, returns the translated text"""
+        if self.cache is not None:
+            cache_key = self.cache.make_key(text, dest)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return cached
+
+        if self.breaker is not None:
+            self.breaker.check()
+
+        waiting = self.queued + (self.batcher.pending if self.batcher else 0)
+        if self.max_queue and waiting >= self.max_queue:
+            self.rejected += 1
+            raise TranslationQueueFull(f"{waiting} Übersetzungen warten bereits")
+
+        if self.batcher is not None:
+            translated = await self.batcher.submit(text, dest)
+        else:
+            translated = (await self._run([text], dest))[0]
+
+        if self.cache is not None:
+            self.cache.put(cache_key, translated)
+        return translated
+
+    async def _run(self, texts, dest):
+        """Send one upstream call for texts on a worker thread"""
+        self.queued += len(texts)
+        waiting = True
+        try:
+            if self.rate_limiter is not None:
+                await self.rate_limiter.acquire(len(texts))
+            async with self._semaphore:
+                self.queued -= len(texts)
+                waiting = False
+                if self.breaker is not None:
+                    self.breaker.before_call()
+                self.in_flight += 1
+                try:
+                    loop = asyncio.get_running_loop()
+                    results = await loop.run_in_executor(
+                        self._executor,
+                        functools.partial(self.backend.translate_batch, texts, dest)
+                    )
+                except asyncio.CancelledError:
+                    if self.breaker is not None:
+                        self.breaker.release()
+                    raise
+                except Exception:
+                    self.failed += len(texts)
+                    if self.breaker is not None:
+                        self.breaker.record_failure()
+                    raise
+                finally:
+                    self.in_flight -= 1
+        finally:
+            if waiting:
+                self.queued -= len(texts)
+
+        if self.breaker is not None:
+            self.breaker.record_success()
+        self.completed += len(texts)
+        return results
+
+    def get_stats(self):
+        stats = {
+            'backend': self.backend.name,
+            'workers': self.max_workers,
+            'max_concurrent': self.max_concurrent,
+            'max_queue': self.max_queue,
+            'queued': self.queued,
+            'in_flight': self.in_flight,
+            'completed': self.completed,
+            'failed': self.failed,
+            'rejected': self.rejected
+        }
+        if self.batcher is not None:
+            stats['batching'] = self.batcher.get_stats()
+        if self.rate_limiter is not None:
+            stats['rate_limiter'] = self.rate_limiter.get_stats()
+        if self.breaker is not None:
+            stats['breaker'] = self.breaker.get_stats()
+        return stats
+
+    def close(self):
+        self._executor.shutdown(wait=False)
+        if self.cache is not None:
+            self.cache.close()
@@ -1,12 +1,21 @@
 """
 Web monitoring interface for Discord Translation Bot
-Provides a Flask-based dashboard to monitor bot statistics
+Provides an aiohttp dashboard on the bot's event loop, with Server-Sent Events for live stats
+and a fixed-size time-series history of the main metrics
 """
 
-from flask import Flask, render_template_string, jsonify
+import asyncio
+import base64
+import json
+import os
+import re
 import time
+import zlib
+from array import array
 from datetime import datetime
 
+from aiohttp import web
+
 # Global bot instance reference
 bot_instance = None
 
@@ -15,9 +24,291 @@ def set_bot_instance(bot):
     global bot_instance
     bot_instance = bot
 
+class StatsStream:
+    """Fans out stats snapshots to SSE clients as deltas of the changed top-level keys"""
+    def __init__(self, client_buffer=10):
+        self.client_buffer = client_buffer
+        self._clients = set()
+        self._last = {}
+        self.published = 0
+        self.dropped = 0
+
+    def subscribe(self):
+        queue = asyncio.Queue(maxsize=self.client_buffer)
+        self._clients.add(queue)
+        return queue
+
+    def close(self):
+        """Wake every client with None so its handler returns (server shutdown)"""
+        for queue in self._clients:
+            while not queue.empty():
+                queue.get_nowait()
+            queue.put_nowait(None)
+
+    def unsubscribe(self, queue):
+        self._clients.discard(queue)
+
+    @property
+    def last(self):
+        return self._last
+
+    def publish(self, snapshot):
+        """Called on the event loop whenever a new snapshot was built"""
+        delta = {key: value for key, value in snapshot.items() if self._last.get(key) != value}
+        self._last = snapshot
+        self.published += 1
+        if not delta:
+            return
+        for queue in self._clients:
+            if queue.full():
+                # slow client: drop its backlog and resend everything
+                self.dropped += 1
+                while not queue.empty():
+                    queue.get_nowait()
+                queue.put_nowait(('stats', snapshot))
+            else:
+                queue.put_nowait(('delta', delta))
+
+    def get_stats(self):
+        return {
+            'clients': len(self._clients),
+            'published': self.published,
+            'dropped': self.dropped
+        }
+
+stats_stream = StatsStream()
+
+# Metrics kept in the history: name -> (kind, path in the stats snapshot)
+# Counters are stored as increments per bucket, gauges as the bucket average
+HISTORY_METRICS = {
+    'translations': ('counter', ('translations',)),
+    'errors': ('counter', ('errors',)),
+    'latency': ('gauge', ('latency',)),
+    'translation_queue': ('gauge', ('translation', 'queued')),
+    'scheduler_queue': ('gauge', ('scheduler', 'queued')),
+    'outbox_queue': ('gauge', ('outbox', 'queued')),
+    'cache_hit_rate': ('gauge', ('cache', 'hit_rate')),
+    'rss_bytes': ('gauge', ('memory', 'rss_bytes')),
+    'journal_lag': ('gauge', ('journal', 'lag_seconds')),
+    'journal_active': ('gauge', ('journal', 'active')),
+}
+
+# (name, seconds per bucket, buckets): 10 minutes, 1 day, 30 days
+HISTORY_RESOLUTIONS = (
+    ('second', 1, 600),
+    ('minute', 60, 1440),
+    ('hour', 3600, 720),
+)
+# Tiers written to disk; the per-second tier is not worth keeping across restarts
+HISTORY_PERSISTED = ('minute', 'hour')
+
+_RANGE_UNITS = {'s': 1, 'm': 60, 'h': 3600, 'd': 86400}
+
+class _Ring:
+    """Fixed-size ring of (bucket number, sum, count) slots for one metric at one resolution"""
+    __slots__ = ('step', 'size', 'buckets', 'sums', 'counts')
+
+    def __init__(self, step, size):
+        self.step = step
+        self.size = size
+        self.buckets = array('q', [-1]) * size  # absolute bucket number stored in each slot
+        self.sums = array('d', [0.0]) * size
+        self.counts = array('q', [0]) * size
+
+    def add(self, timestamp, value):
+        bucket = int(timestamp // self.step)
+        slot = bucket % self.size
+        if self.buckets[slot] != bucket:
+            # slot still holds an older lap of the ring: start over
+            self.buckets[slot] = bucket
+            self.sums[slot] = 0.0
+            self.counts[slot] = 0
+        self.sums[slot] += value
+        self.counts[slot] += 1
+
+    def read(self, first, last, average):
+        """Values for buckets first..last, None where nothing was recorded"""
+        values = []
+        for bucket in range(first, last + 1):
+            slot = bucket % self.size
+            if self.buckets[slot] == bucket and self.counts[slot]:
+                value = self.sums[slot] / self.counts[slot] if average else self.sums[slot]
+                values.append(round(value, 4))
+            else:
+                values.append(None)
+        return values
+
+    def dump(self):
+        return {name: base64.b64encode(zlib.compress(getattr(self, name).tobytes())).decode('ascii')
+                for name in ('buckets', 'sums', 'counts')}
+
+    def restore(self, data):
+        loaded = {}
+        for name in ('buckets', 'sums', 'counts'):
+            values = array(getattr(self, name).typecode)
+            values.frombytes(zlib.decompress(base64.b64decode(data[name])))
+            if len(values) != self.size:
+                return False  # resolution changed since the snapshot was written
+            loaded[name] = values
+        for name, values in loaded.items():
+            setattr(self, name, values)
+        return True
+
+class TimeSeriesStore:
+    """Multi-resolution history of selected stats, fixed memory, snapshotted to disk
+
+    Every recorded stats snapshot is added to all tiers at once, so the coarse
+    tiers are rollups of the same samples rather than a second collection path.
+    """
+    def __init__(self, metrics=HISTORY_METRICS, resolutions=HISTORY_RESOLUTIONS):
+        self.metrics = dict(metrics)
+        self.resolutions = {name: (step, size) for name, step, size in resolutions}
+        self._rings = {
+            metric: {name: _Ring(step, size) for name, (step, size) in self.resolutions.items()}
+            for metric in self.metrics
+        }
+        self._previous = {}  # counter name -> last raw value
+        self.path = None
+        self.save_interval = 300
+        self._last_saved = time.time()
+        self._saving = False
+
+        self.samples = 0
+        self.saves = 0
+        self.save_errors = 0
+        self.restored = 0
+
+    @staticmethod
+    def _lookup(snapshot, path):
+        value = snapshot
+        for key in path:
+            if not isinstance(value, dict):
+                return None
+            value = value.get(key)
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            return None
+        return value
+
+    def record(self, snapshot):
+        """Add one stats snapshot (called on the event loop after every refresh)"""
+        timestamp = snapshot.get('snapshot_at') or time.time()
+        for metric, (kind, path) in self.metrics.items():
+            value = self._lookup(snapshot, path)
+            if value is None:
+                continue
+            if kind == 'counter':
+                previous = self._previous.get(metric)
+                self._previous[metric] = value
+                if previous is None:
+                    continue  # first sample after start: no increment known yet
+                value = value - previous if value >= previous else value  # counter was reset
+            for ring in self._rings[metric].values():
+                ring.add(timestamp, value)
+        self.samples += 1
+
+        if self.path and not self._saving and timestamp - self._last_saved >= self.save_interval:
+            self._saving = True
+            self._last_saved = timestamp
+            data = self._dump()
+            future = asyncio.get_running_loop().run_in_executor(None, self._write, data)
+            future.add_done_callback(self._saved)
+
+    def query(self, metrics, seconds, now=None):
+        """Values of metrics over the last seconds, from the finest tier that covers the range"""
+        now = now if now is not None else time.time()
+        resolution = None
+        for name, (step, size) in sorted(self.resolutions.items(), key=lambda item: item[1][0]):
+            resolution = name
+            if step * size >= seconds:
+                break
+        step, size = self.resolutions[resolution]
+        last = int(now // step)
+        first = max(last - int(seconds // step) + 1, last - size + 1)
+        return {
+            'resolution': resolution,
+            'step': step,
+            'range': seconds,
+            'timestamps': [bucket * step for bucket in range(first, last + 1)],
+            'series': {
+                metric: self._rings[metric][resolution].read(first, last, self.metrics[metric][0] == 'gauge')
+                for metric in metrics
+            }
+        }
+
+    def open(self, path, save_interval=300):
+        """Set the snapshot file and load the history it contains"""
+        self.path = path
+        self.save_interval = save_interval
+        if not os.path.exists(path):
+            return
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            for metric, tiers in data.get('series', {}).items():
+                for resolution, ring_data in tiers.items():
+                    ring = self._rings.get(metric, {}).get(resolution)
+                    if ring is not None and ring.restore(ring_data):
+                        self.restored += 1
+        except (OSError, ValueError, KeyError, zlib.error) as e:
+            print(f"⚠️ Verlauf konnte nicht geladen werden: {e}")
+
+    def save(self):
+        """Write the snapshot synchronously (shutdown)"""
+        if not self.path:
+            return
+        try:
+            self._write(self._dump())
+            self.saves += 1
+        except OSError as e:
+            self.save_errors += 1
+            print(f"⚠️ Verlauf konnte nicht gespeichert werden: {e}")
+
+    def _dump(self):
+        return {
+            'saved_at': time.time(),
+            'series': {
+                metric: {name: tiers[name].dump() for name in HISTORY_PERSISTED if name in tiers}
+                for metric, tiers in self._rings.items()
+            }
+        }
+
+    def _write(self, data):
+        tmp_path = self.path + '.tmp'
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(data, f)
+        os.replace(tmp_path, self.path)
+
+    def _saved(self, future):
+        self._saving = False
+        if future.exception() is not None:
+            self.save_errors += 1
+            print(f"⚠️ Verlauf konnte nicht gespeichert werden: {future.exception()}")
+        else:
+            self.saves += 1
+
+    def get_stats(self):
+        return {
+            'metrics': len(self.metrics),
+            'samples': self.samples,
+            'saves': self.saves,
+            'save_errors': self.save_errors,
+            'restored_series': self.restored
+        }
+
+def parse_range(value, default=600):
+    """'90s', '15m', '24h', '30d' or plain seconds -> seconds"""
+    if not value:
+        return default
+    match = re.fullmatch(r'(\d+)([smhd]?)', value.strip())
+    if not match:
+        raise ValueError(f"Ungültiger Zeitraum: {value}")
+    return int(match.group(1)) * _RANGE_UNITS.get(match.group(2) or 's')
+
+stats_history = TimeSeriesStore()
+
 def create_web_app():
-    """Create and configure Flask application"""
-    app = Flask(__name__)
+    """Create and configure the aiohttp application"""
+    app = web.Application()
     
     # HTML template for the monitoring dashboard
     DASHBOARD_TEMPLATE = """
@@ -105,6 +396,54 @@ def create_web_app():
                                     <td><strong>Latenz:</strong></td>
                                     <td id="latency">-</td>
                                 </tr>
+                                <tr>
+                                    <td><strong>Warteschlange:</strong></td>
+                                    <td id="translation-queue">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Aktive Übersetzungen:</strong></td>
+                                    <td id="translation-in-flight">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Upstream:</strong></td>
+                                    <td id="upstream-status">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Scheduler:</strong></td>
+                                    <td id="scheduler-status">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Outbox:</strong></td>
+                                    <td id="outbox-status">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Job-Journal:</strong></td>
+                                    <td id="journal-status">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Cache-Trefferquote:</strong></td>
+                                    <td id="cache-hit-rate">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Nachrichten-Cache:</strong></td>
+                                    <td id="message-cache">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Speicher (RSS):</strong></td>
+                                    <td id="memory-usage">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Gesparte Zeichen:</strong></td>
+                                    <td id="chars-saved">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Gesparte Upstream-Aufrufe:</strong></td>
+                                    <td id="upstream-saved">-</td>
+                                </tr>
+                                <tr>
+                                    <td><strong>Zusammengeführte Anfragen:</strong></td>
+                                    <td id="coalesced-requests">-</td>
+                                </tr>
                                 <tr>
                                     <td><strong>Letzte Aktualisierung:</strong></td>
                                     <td id="last-update">-</td>
@@ -125,11 +464,34 @@ def create_web_app():
                 </div>
             </div>
             
-            <div class="row">
+            <div class="row mb-4 d-none" id="shards-row">
                 <div class="col-12">
                     <div class="card">
                         <div class="card-header">
+                            <h5><i class="fas fa-network-wired"></i> Shards</h5>
+                        </div>
+                        <div class="card-body">
+                            <table class="table table-sm mb-0">
+                                <thead>
+                                    <tr><th>Shard</th><th>Worker</th><th>Latenz</th><th>Server</th><th>Übersetzungen</th><th>pro Minute</th></tr>
+                                </thead>
+                                <tbody id="shards-table"></tbody>
+                            </table>
+                        </div>
+                    </div>
+                </div>
+            </div>
+            
+            <div class="row">
+                <div class="col-12">
+                    <div class="card">
+                        <div class="card-header d-flex justify-content-between align-items-center">
                             <h5><i class="fas fa-chart-line"></i> Nutzungsstatistiken</h5>
+                            <div class="btn-group btn-group-sm" id="history-range">
+                                <button class="btn btn-outline-primary active" data-range="10m">10 Min</button>
+                                <button class="btn btn-outline-primary" data-range="24h">24 Std</button>
+                                <button class="btn btn-outline-primary" data-range="30d">30 Tage</button>
+                            </div>
                         </div>
                         <div class="card-body">
                             <canvas id="statsChart" width="400" height="100"></canvas>
@@ -142,26 +504,25 @@ def create_web_app():
         <script src="https://cdn.jsdelivr.net/npm/bootstrap@5.3.0/dist/js/bootstrap.bundle.min.js"></script>
         <script src="https://cdn.jsdelivr.net/npm/chart.js"></script>
         <script>
-            let translationsHistory = [];
-            let errorsHistory = [];
-            let timeLabels = [];
             let chart;
+            let historyRange = '10m';
+            let historyTimer;
             
             function initChart() {
                 const ctx = document.getElementById('statsChart').getContext('2d');
                 chart = new Chart(ctx, {
                     type: 'line',
                     data: {
-                        labels: timeLabels,
+                        labels: [],
                         datasets: [{
                             label: 'Übersetzungen',
-                            data: translationsHistory,
+                            data: [],
                             borderColor: '#0d6efd',
                             backgroundColor: 'rgba(13, 110, 253, 0.1)',
                             tension: 0.1
                         }, {
                             label: 'Fehler',
-                            data: errorsHistory,
+                            data: [],
                             borderColor: '#dc3545',
                             backgroundColor: 'rgba(220, 53, 69, 0.1)',
                             tension: 0.1
@@ -169,6 +530,7 @@ def create_web_app():
                     },
                     options: {
                         responsive: true,
+                        spanGaps: true,
                         scales: {
                             y: {
                                 beginAtZero: true
@@ -178,52 +540,135 @@ def create_web_app():
                 });
             }
             
+            let currentStats = {};
+            
+            function renderStats(data) {
+                // Update status
+                const statusElement = document.getElementById('bot-status');
+                const statusIcon = document.getElementById('status-icon');
+                
+                if (data.status === 'Running') {
+                    statusElement.textContent = 'Online';
+                    statusElement.className = 'card-text status-running';
+                    statusIcon.className = 'fas fa-power-off fa-2x mb-2 status-running';
+                } else {
+                    statusElement.textContent = 'Offline';
+                    statusElement.className = 'card-text status-stopped';
+                    statusIcon.className = 'fas fa-power-off fa-2x mb-2 status-stopped';
+                }
+                
+                // Update metrics
+                document.getElementById('translations-count').textContent = data.translations || 0;
+                document.getElementById('errors-count').textContent = data.errors || 0;
+                document.getElementById('guilds-count').textContent = data.guilds || '-';
+                document.getElementById('users-count').textContent = data.users || '-';
+                document.getElementById('latency').textContent = data.latency ? data.latency + ' ms' : '-';
+                const translation = data.translation || {};
+                document.getElementById('translation-queue').textContent = translation.queued !== undefined ? `${translation.queued} / ${translation.max_queue}` : '-';
+                document.getElementById('translation-in-flight').textContent = translation.in_flight !== undefined ? `${translation.in_flight} / ${translation.max_concurrent}` : '-';
+                if (translation.backend) {
+                    const breaker = translation.breaker || {};
+                    const limiter = translation.rate_limiter || {};
+                    const breakerText = { closed: 'OK', open: 'gesperrt', half_open: 'wird getestet' }[breaker.state] || '-';
+                    document.getElementById('upstream-status').textContent =
+                        `${translation.backend} · ${breakerText} · Ø Wartezeit ${limiter.avg_wait_ms || 0} ms`;
+                }
+                const scheduler = data.scheduler || {};
+                document.getElementById('scheduler-status').textContent = scheduler.running !== undefined
+                    ? `${scheduler.running} aktiv · ${scheduler.queued} wartend · ${scheduler.dropped_user + scheduler.dropped_guild} verworfen`
+                    : '-';
+                const outbox = data.outbox || {};
+                document.getElementById('outbox-status').textContent = outbox.queued !== undefined
+                    ? `${outbox.queued} wartend · ${outbox.messages_sent} gesendet · ${outbox.rate_limited} × 429`
+                    : '-';
+                const journal = data.journal || {};
+                document.getElementById('journal-status').textContent = journal.active !== undefined
+                    ? `${journal.active} offen · ${(journal.lag_seconds * 1000).toFixed(0)} ms Verzögerung · ` +
+                      `${journal.rows_per_commit} Einträge/Commit · ${journal.replayed} nachgeholt ` +
+                      `(${journal.replay_deduped} doppelt, ${journal.replay_expired} abgelaufen)` +
+                      (journal.enabled ? '' : ' · nur im Speicher')
+                    : '-';
+                const cache = data.cache || {};
+                document.getElementById('cache-hit-rate').textContent = cache.hit_rate !== undefined
+                    ? `${(cache.hit_rate * 100).toFixed(1)} % (${cache.memory_entries} im Speicher, ${cache.disk_entries} auf Disk)`
+                    : '-';
+                const messageCache = data.message_cache || {};
+                document.getElementById('message-cache').textContent = messageCache.hit_rate !== undefined
+                    ? `${(messageCache.hit_rate * 100).toFixed(1)} % Treffer (${messageCache.entries} / ${messageCache.max_entries})`
+                    : '-';
+                const memory = data.memory || {};
+                document.getElementById('memory-usage').textContent = memory.rss_bytes
+                    ? `${(memory.rss_bytes / 1048576).toFixed(1)} MB · ${(memory.rss_per_guild_bytes / 1024).toFixed(1)} KB/Server · ` +
+                      `${memory.cached_members} Mitglieder, ${memory.cached_messages} Nachrichten im Cache (${memory.profile})`
+                    : '-';
+                const segmenter = data.segmenter || {};
+                document.getElementById('chars-saved').textContent = segmenter.chars_saved !== undefined
+                    ? `${segmenter.chars_saved} von ${segmenter.chars_total} (${segmenter.protected_spans} geschützte Stellen, ${segmenter.split_messages} geteilte Nachrichten)`
+                    : '-';
+                const detection = data.language_detection || {};
+                document.getElementById('upstream-saved').textContent = detection.upstream_saved !== undefined ? detection.upstream_saved : '-';
+                const coalescing = data.coalescing || {};
+                document.getElementById('coalesced-requests').textContent = coalescing.merged !== undefined ? coalescing.merged : '-';
+                document.getElementById('last-update').textContent = new Date().toLocaleString('de-DE');
+                
+                // Sharded mode: one row per shard, merged from all worker processes
+                const shards = Object.entries(data.shards || {});
+                document.getElementById('shards-row').classList.toggle('d-none', shards.length === 0);
+                document.getElementById('shards-table').innerHTML = shards.map(([shardId, shard]) =>
+                    `<tr><td>${shardId}</td><td>${shard.worker ?? '-'}</td><td>${shard.latency} ms</td>` +
+                    `<td>${shard.guilds}</td><td>${shard.translations}</td><td>${shard.translations_per_min ?? '-'}</td></tr>`
+                ).join('');
+            }
+            
+            function loadHistory() {
+                // Whole range in one request, kept server-side across reloads
+                fetch(`/api/history?metric=translations,errors&range=${historyRange}`)
+                    .then(response => response.json())
+                    .then(history => {
+                        const longRange = history.range > 86400;
+                        chart.data.labels = history.timestamps.map(ts => {
+                            const date = new Date(ts * 1000);
+                            return longRange ? date.toLocaleString('de-DE') : date.toLocaleTimeString('de-DE');
+                        });
+                        chart.data.datasets[0].data = history.series.translations;
+                        chart.data.datasets[1].data = history.series.errors;
+                        chart.update();
+                        
+                        clearTimeout(historyTimer);
+                        historyTimer = setTimeout(loadHistory, Math.max(history.step, 5) * 1000);
+                    })
+                    .catch(error => {
+                        console.error('Error loading history:', error);
+                        historyTimer = setTimeout(loadHistory, 30000);
+                    });
+            }
+            
             function updateStats() {
                 fetch('/api/stats')
                     .then(response => response.json())
                     .then(data => {
-                        // Update status
-                        const statusElement = document.getElementById('bot-status');
-                        const statusIcon = document.getElementById('status-icon');
-                        
-                        if (data.status === 'Running') {
-                            statusElement.textContent = 'Online';
-                            statusElement.className = 'card-text status-running';
-                            statusIcon.className = 'fas fa-power-off fa-2x mb-2 status-running';
-                        } else {
-                            statusElement.textContent = 'Offline';
-                            statusElement.className = 'card-text status-stopped';
-                            statusIcon.className = 'fas fa-power-off fa-2x mb-2 status-stopped';
-                        }
-                        
-                        // Update metrics
-                        document.getElementById('translations-count').textContent = data.translations || 0;
-                        document.getElementById('errors-count').textContent = data.errors || 0;
-                        document.getElementById('guilds-count').textContent = data.guilds || '-';
-                        document.getElementById('users-count').textContent = data.users || '-';
-                        document.getElementById('latency').textContent = data.latency ? data.latency + ' ms' : '-';
-                        document.getElementById('last-update').textContent = new Date().toLocaleString('de-DE');
-                        
-                        // Update chart data
-                        const now = new Date().toLocaleTimeString('de-DE');
-                        timeLabels.push(now);
-                        translationsHistory.push(data.translations || 0);
-                        errorsHistory.push(data.errors || 0);
-                        
-                        // Keep only last 20 data points
-                        if (timeLabels.length > 20) {
-                            timeLabels.shift();
-                            translationsHistory.shift();
-                            errorsHistory.shift();
-                        }
-                        
-                        chart.update();
+                        currentStats = data;
+                        renderStats(currentStats);
                     })
                     .catch(error => {
                         console.error('Error fetching stats:', error);
                     });
             }
             
+            function connectStream() {
+                // Server pushes the full stats once, then only the changed parts
+                const source = new EventSource('/api/stream');
+                source.addEventListener('stats', event => {
+                    currentStats = JSON.parse(event.data);
+                    renderStats(currentStats);
+                });
+                source.addEventListener('delta', event => {
+                    currentStats = Object.assign({}, currentStats, JSON.parse(event.data));
+                    renderStats(currentStats);
+                });
+                source.onerror = () => console.warn('Stats-Stream unterbrochen, Browser verbindet neu...');
+            }
+            
             function loadSupportedFlags() {
                 fetch('/api/flags')
                     .then(response => response.json())
@@ -247,24 +692,36 @@ def create_web_app():
             // Initialize page
             document.addEventListener('DOMContentLoaded', function() {
                 initChart();
+                loadHistory();
                 loadSupportedFlags();
-                updateStats();
                 
-                // Update stats every 5 seconds
-                setInterval(updateStats, 5000);
+                document.querySelectorAll('#history-range button').forEach(button => {
+                    button.addEventListener('click', () => {
+                        document.querySelectorAll('#history-range button').forEach(b => b.classList.remove('active'));
+                        button.classList.add('active');
+                        historyRange = button.dataset.range;
+                        loadHistory();
+                    });
+                });
+                
+                if (window.EventSource) {
+                    connectStream();
+                } else {
+                    // Fallback for browsers without SSE: poll every 5 seconds
+                    updateStats();
+                    setInterval(updateStats, 5000);
+                }
             });
         </script>
     </body>
     </html>
     """
     
-    @app.route('/')
-    def dashboard():
+    async def dashboard(request):
         """Main dashboard page"""
-        return render_template_string(DASHBOARD_TEMPLATE)
+        return web.Response(text=DASHBOARD_TEMPLATE, content_type='text/html')
     
-    @app.route('/api/stats')
-    def api_stats():
+    async def api_stats(request):
         """API endpoint for bot statistics"""
         if bot_instance:
             stats = bot_instance.get_stats()
@@ -278,25 +735,93 @@ def create_web_app():
                 'latency': 0
             }
         
-        return jsonify(stats)
+        return web.json_response(stats)
+    
+    async def api_stream(request):
+        """Server-Sent Events: full stats on connect, then deltas on every snapshot"""
+        response = web.StreamResponse(headers={
+            'Content-Type': 'text/event-stream',
+            'Cache-Control': 'no-cache',
+            'X-Accel-Buffering': 'no'
+        })
+        await response.prepare(request)
+        queue = stats_stream.subscribe()
+        try:
+            initial = stats_stream.last or (bot_instance.get_stats() if bot_instance else {})
+            await response.write(f"event: stats\ndata: {json.dumps(initial)}\n\n".encode('utf-8'))
+            while True:
+                try:
+                    item = await asyncio.wait_for(queue.get(), timeout=15)
+                except asyncio.TimeoutError:
+                    await response.write(b": ping\n\n")  # keeps proxies from closing idle streams
+                    continue
+                if item is None:
+                    break  # server is shutting down
+                event, data = item
+                await response.write(f"event: {event}\ndata: {json.dumps(data)}\n\n".encode('utf-8'))
+        except ConnectionResetError:
+            pass
+        finally:
+            stats_stream.unsubscribe(queue)
+        return response
     
-    @app.route('/api/flags')
-    def api_flags():
+    async def api_history(request):
+        """Stored history: ?metric=translations,errors&range=24h"""
+        names = [name for name in request.query.get('metric', 'translations').split(',') if name]
+        unknown = [name for name in names if name not in stats_history.metrics]
+        if unknown:
+            return web.json_response({'error': f"Unbekannte Metrik: {', '.join(unknown)}",
+                                      'metrics': list(stats_history.metrics)}, status=400)
+        try:
+            seconds = parse_range(request.query.get('range'))
+        except ValueError as e:
+            return web.json_response({'error': str(e)}, status=400)
+        return web.json_response(stats_history.query(names, seconds))
+    
+    async def api_flags(request):
         """API endpoint for supported flags and languages"""
         if bot_instance and hasattr(bot_instance, 'FLAG_LANG_MAP'):
             flags = bot_instance.FLAG_LANG_MAP
         else:
             flags = {}
         
-        return jsonify({'flags': flags})
+        return web.json_response({'flags': flags})
+    
+    async def prometheus_metrics(request):
+        """Prometheus scrape endpoint"""
+        body = ''
+        if bot_instance and hasattr(bot_instance, 'metrics'):
+            body = bot_instance.metrics.render()
+        return web.Response(body=body.encode('utf-8'), headers={'Content-Type': 'text/plain; version=0.0.4; charset=utf-8'})
     
-    @app.route('/health')
-    def health_check():
+    async def health_check(request):
         """Health check endpoint"""
-        return jsonify({
+        return web.json_response({
             'status': 'healthy',
             'timestamp': datetime.now().isoformat(),
-            'bot_connected': bot_instance is not None and hasattr(bot_instance, 'stats')
+            'bot_connected': bot_instance is not None and hasattr(bot_instance, 'get_stats')
         })
     
+    app.router.add_get('/', dashboard)
+    app.router.add_get('/api/stats', api_stats)
+    app.router.add_get('/api/stream', api_stream)
+    app.router.add_get('/api/history', api_history)
+    app.router.add_get('/api/flags', api_flags)
+    app.router.add_get('/metrics', prometheus_metrics)
+    app.router.add_get('/health', health_check)
+
+    async def close_streams(app):
+        stats_stream.close()
+
+    # open dashboards would otherwise keep cleanup() waiting on their streams
+    app.on_shutdown.append(close_streams)
+    
     return app
+
+async def start_web_server(host='0.0.0.0', port=5000):
+    """Serve the monitor on the running event loop, returns the runner for cleanup()"""
+    runner = web.AppRunner(create_web_app(), shutdown_timeout=2.0)
+    await runner.setup()
+    site = web.TCPSite(runner, host, port)
+    await site.start()
+    return runner